@@ -29,9 +29,13 @@ def run_pipeline(season_year=2025):
         # EXTRACT
         logger.info("\n--- EXTRACT PHASE ---")
         scraper = NBAPlayerStatsScraper()
-        raw_data = scraper.scrape_season_totals(season_year)
+        try:
+            raw_data = scraper.scrape_season_totals(season_year)
+        finally:
+            # Release the pooled HTTP client / fallback browser even if scraping fails
+            scraper.close()
         
-        if not raw_data:
+        if raw_data.empty:
             logger.error("No data extracted. Pipeline failed.")
             return False
         
@@ -51,12 +55,20 @@ def run_pipeline(season_year=2025):
         # LOAD
         logger.info("\n--- LOAD PHASE ---")
         loader = NBADataLoader()
-        
-        # Save to CSV
-        csv_path = loader.load_to_csv(clean_data, season_year)
-        
-        # Save to SQLite
-        db_success = loader.load_to_sqlite(clean_data, table_name='player_totals', if_exists='replace')
+        try:
+            # Save to CSV
+            csv_path = loader.load_to_csv(clean_data, season_year)
+            
+            # Save to Parquet
+            parquet_path = loader.load_to_parquet(clean_data, season_year)
+            
+            # Save to SQLite
+            db_success = loader.load_to_sqlite(clean_data, table_name='player_totals', if_exists='replace')
+            
+            # Save to DuckDB (columnar copy for analytics)
+            loader.load_to_duckdb(clean_data, table_name='player_totals')
+        finally:
+            loader.close()
         
         if csv_path and db_success:
             logger.info("✓ Data successfully loaded to both CSV and SQLite")
@@ -72,6 +84,7 @@ def run_pipeline(season_year=2025):
         logger.info(f"Records processed: {len(clean_data)}")
         logger.info(f"Duration: {duration:.2f} seconds")
         logger.info(f"CSV output: {csv_path}")
+        logger.info(f"Parquet output: {parquet_path}")
         logger.info(f"Database: {loader.db_path}")
         logger.info("="*80)
         
@@ -1,16 +1,32 @@
 import pandas as pd
 import sqlite3
+import duckdb
 import os
 import logging
+from itertools import islice
 from datetime import datetime
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow is optional here; CSV output falls back to pandas
+    pa = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Multi-row INSERT ... VALUES (...), (...) needs SQLite 3.7.11+
+SQLITE_MULTI_ROW_VALUES = sqlite3.sqlite_version_info >= (3, 7, 11)
+
+# Bound-parameter limit assumed when the connection cannot report it (Python < 3.11):
+# SQLite's compile-time default before 3.32, and the lowest a build normally ships with
+SQLITE_DEFAULT_MAX_VARIABLES = 999
+
 
 class NBADataLoader:
     """
-    Loads transformed NBA data into storage (CSV and/or SQLite).
+    Loads transformed NBA data into storage (CSV, Parquet, SQLite and/or DuckDB).
     """
     
     def __init__(self, data_dir='data'):
@@ -18,15 +34,42 @@ class NBADataLoader:
         self.raw_dir = os.path.join(data_dir, 'raw')
         self.processed_dir = os.path.join(data_dir, 'processed')
         self.db_path = os.path.join(data_dir, 'nba_stats.db')
+        self._conn = None  # Shared SQLite connection, opened on first use
         
         # Create directories if they don't exist
         os.makedirs(self.raw_dir, exist_ok=True)
         os.makedirs(self.processed_dir, exist_ok=True)
     
+    def _get_connection(self):
+        """
+        Return the shared SQLite connection, opening and configuring it on first use.
+        
+        The connection is in autocommit mode so transactions are controlled explicitly.
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            
+            # Standard SQLite bulk-load settings, applied once per connection
+            for pragma in ("journal_mode=WAL", "synchronous=NORMAL", "temp_store=MEMORY", "cache_size=-200000"):
+                self._conn.execute(f"PRAGMA {pragma}")
+            logger.info(f"SQLite connection opened: {self.db_path}")
+        return self._conn
+    
+    def close(self):
+        """
+        Close the shared SQLite connection.
+        """
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+            logger.info("SQLite connection closed")
+    
     def load_to_csv(self, df, season_year):
         """
         Save DataFrame to CSV file.
         
+        Uses pyarrow's multithreaded C++ CSV writer when available, otherwise pandas.
+        
         Args:
             df: pandas DataFrame
             season_year: Season year for filename
@@ -39,7 +82,11 @@ class NBADataLoader:
         filepath = os.path.join(self.processed_dir, filename)
         
         try:
-            df.to_csv(filepath, index=False)
+            if pa is not None:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                pacsv.write_csv(table, filepath, write_options=pacsv.WriteOptions(batch_size=8192))
+            else:
+                df.to_csv(filepath, index=False)
             logger.info(f"Data saved to CSV: {filepath}")
             logger.info(f"Rows saved: {len(df)}")
             return filepath
@@ -47,6 +94,43 @@ class NBADataLoader:
             logger.error(f"Error saving to CSV: {e}")
             return None
     
+    def load_to_parquet(self, df, season_year):
+        """
+        Save DataFrame to a snappy-compressed Parquet file.
+        
+        Low-cardinality string columns are stored as categoricals and
+        dictionary-encoded, so the file is typed, column-prunable and several
+        times smaller than the CSV.
+        
+        Args:
+            df: pandas DataFrame
+            season_year: Season year for filename
+        
+        Returns:
+            Path to saved file
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"nba_player_totals_{season_year}_{timestamp}.parquet"
+        filepath = os.path.join(self.processed_dir, filename)
+        
+        try:
+            dictionary_columns = [col for col in ['player', 'team_id', 'pos'] if col in df.columns]
+            parquet_df = df.astype({col: 'category' for col in dictionary_columns})
+            
+            parquet_df.to_parquet(
+                filepath,
+                index=False,
+                engine='pyarrow',
+                compression='snappy',
+                use_dictionary=dictionary_columns
+            )
+            logger.info(f"Data saved to Parquet: {filepath}")
+            logger.info(f"Rows saved: {len(df)}")
+            return filepath
+        except Exception as e:
+            logger.error(f"Error saving to Parquet: {e}")
+            return None
+    
     def load_to_sqlite(self, df, table_name='player_totals', if_exists='replace'):
         """
         Save DataFrame to SQLite database.
@@ -60,19 +144,51 @@ class NBADataLoader:
             True if successful, False otherwise
         """
         try:
-            # Connect to database
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_connection()
             
-            # Write DataFrame to SQL
-            df.to_sql(table_name, conn, if_exists=if_exists, index=False)
+            # Write DataFrame to SQL in a single transaction
+            conn.execute("BEGIN")
+            try:
+                table_exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (table_name,)
+                ).fetchone() is not None
+                
+                if table_exists and if_exists == 'fail':
+                    raise ValueError(f"Table '{table_name}' already exists")
+                if table_exists and if_exists == 'replace':
+                    conn.execute(f'DROP TABLE "{table_name}"')
+                    table_exists = False
+                if not table_exists:
+                    conn.execute(self._create_table_sql(df, table_name))
+                
+                # Insert in multi-row VALUES chunks sized to the bound-parameter limit
+                columns = ", ".join(f'"{col}"' for col in df.columns)
+                row_placeholders = f"({', '.join('?' * len(df.columns))})"
+                chunksize = self._insert_chunksize(len(df.columns))
+                
+                rows = df.itertuples(index=False, name=None)
+                while chunk := list(islice(rows, chunksize)):
+                    values = ", ".join([row_placeholders] * len(chunk))
+                    conn.execute(
+                        f'INSERT INTO "{table_name}" ({columns}) VALUES {values}',
+                        [value for row in chunk for value in row]
+                    )
+                
+                # Index the common lookup / ranking columns and refresh planner statistics
+                for index_sql in self._index_sql(df, table_name):
+                    conn.execute(index_sql)
+                conn.execute(f'ANALYZE "{table_name}"')
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
             
             # Get row count to confirm
             cursor = conn.cursor()
             cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
             row_count = cursor.fetchone()[0]
             
-            conn.close()
-            
             logger.info(f"Data saved to SQLite: {self.db_path}")
             logger.info(f"Table: {table_name}")
             logger.info(f"Rows in table: {row_count}")
@@ -83,6 +199,93 @@ class NBADataLoader:
             logger.error(f"Error saving to SQLite: {e}")
             return False
     
+    def load_to_duckdb(self, df, table_name='player_totals'):
+        """
+        Save DataFrame to a DuckDB database next to the SQLite file.
+        
+        DuckDB scans the registered DataFrame directly (via Arrow), so the whole
+        table is created in one vectorized CREATE TABLE AS SELECT with no
+        Python-side row iteration.
+        
+        Args:
+            df: pandas DataFrame
+            table_name: Name of the table (replaced if it exists)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            duckdb_path = str(Path(self.db_path).with_suffix('.duckdb'))
+            con = duckdb.connect(duckdb_path)
+            try:
+                con.register('tmp_df', df)
+                con.execute(f'CREATE OR REPLACE TABLE "{table_name}" AS SELECT * FROM tmp_df')
+                con.unregister('tmp_df')
+                row_count = con.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+            finally:
+                con.close()
+            
+            logger.info(f"Data saved to DuckDB: {duckdb_path}")
+            logger.info(f"Table: {table_name}")
+            logger.info(f"Rows in table: {row_count}")
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error saving to DuckDB: {e}")
+            return False
+    
+    def _insert_chunksize(self, num_columns):
+        """
+        Number of rows per multi-row INSERT statement.
+        
+        Each row binds one parameter per column, so a statement can hold at most
+        (bound-parameter limit) // num_columns rows. The limit is read from the
+        live connection, since builds can compile in a lower one.
+        """
+        if not SQLITE_MULTI_ROW_VALUES:
+            return 1
+        conn = self._get_connection()
+        if hasattr(conn, 'getlimit'):
+            max_variables = conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+        else:
+            max_variables = SQLITE_DEFAULT_MAX_VARIABLES
+        return max(1, max_variables // max(1, num_columns))
+    
+    def _index_sql(self, df, table_name):
+        """
+        Build CREATE INDEX statements for the columns downstream queries filter and sort on.
+        """
+        indexes = {
+            f"idx_{table_name}_player": ['player', 'season_year'],
+            f"idx_{table_name}_season_pts": ['season_year', 'pts_per_game DESC']
+        }
+        
+        statements = []
+        for index_name, index_columns in indexes.items():
+            if all(col.split()[0] in df.columns for col in index_columns):
+                columns = ", ".join(index_columns)
+                statements.append(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table_name}" ({columns})')
+        return statements
+    
+    def _create_table_sql(self, df, table_name):
+        """
+        Build a CREATE TABLE statement mapping DataFrame dtypes to SQLite types.
+        """
+        column_defs = []
+        for col, dtype in df.dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+                sql_type = 'INTEGER'
+            elif pd.api.types.is_float_dtype(dtype):
+                sql_type = 'REAL'
+            elif pd.api.types.is_datetime64_any_dtype(dtype):
+                sql_type = 'TIMESTAMP'
+            else:
+                sql_type = 'TEXT'
+            column_defs.append(f'"{col}" {sql_type}')
+        
+        return f'CREATE TABLE "{table_name}" ({", ".join(column_defs)})'
+    
     def query_database(self, query):
         """
         Execute a SQL query and return results as DataFrame.
@@ -94,10 +297,7 @@ class NBADataLoader:
             pandas DataFrame with query results
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            df = pd.read_sql_query(query, conn)
-            conn.close()
-            return df
+            return pd.read_sql_query(query, self._get_connection())
         except Exception as e:
             logger.error(f"Error querying database: {e}")
             return pd.DataFrame()
@@ -118,7 +318,7 @@ if __name__ == "__main__":
     scraper = NBAPlayerStatsScraper()
     raw_data = scraper.scrape_season_totals(2025)
     
-    if raw_data:
+    if not raw_data.empty:
         transformer = NBADataTransformer()
         clean_data = transformer.transform(raw_data)
         
@@ -147,4 +347,6 @@ if __name__ == "__main__":
             
             results = loader.query_database(query)
             print("\nTop scorers (>25 PPG):")
-            print(results.to_string(index=False))
\ No newline at end of file
+            print(results.to_string(index=False))
+        
+        loader.close()
\ No newline at end of file
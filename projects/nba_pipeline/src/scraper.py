@@ -1,10 +1,15 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import httpx
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+import lxml.html
+import os
+import pandas as pd
 import time
 from datetime import datetime
 import logging
@@ -12,16 +17,38 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+)
+
 
 class NBAPlayerStatsScraper:
     """
     Scrapes NBA player season totals from Basketball Reference.
     """
     
-    def __init__(self):
+    def __init__(self, use_browser=False, cache_dir=os.path.join('data', 'raw'), cache_max_age=6 * 3600):
         self.base_url = "https://www.basketball-reference.com"
+        self.use_browser = use_browser  # Force Selenium instead of plain HTTP
+        self.cache_dir = cache_dir  # Raw HTML cache directory (None disables caching)
+        self.cache_max_age = cache_max_age  # Seconds before a cached page is re-fetched
+        self.client = None
         self.driver = None
-        self.request_delay = 3
+        self.request_delay = 3  # Seconds between requests (~20 requests/minute limit)
+        self.max_concurrent = 3  # Max in-flight requests for multi-season scrapes
+    
+    def _setup_client(self):
+        """
+        Set up a pooled HTTP client (reused across requests to avoid repeated TLS handshakes).
+        """
+        if self.client is None:
+            self.client = httpx.Client(
+                headers={'User-Agent': USER_AGENT},
+                timeout=10,
+                follow_redirects=True
+            )
+            logger.info("HTTP client initialized")
     
     def _setup_driver(self):
         """
@@ -40,6 +67,32 @@ class NBAPlayerStatsScraper:
             logger.info("Chrome driver initialized")
 
     def get_page_content(self, url):
+        """
+        Fetch HTML content from a URL.
+
+        Basketball Reference serves the stats table in the static HTML, so a plain
+        HTTP GET is enough. Falls back to Selenium if the table is missing from the
+        response, or always uses it when use_browser=True.
+        """
+        if self.use_browser:
+            return self._get_browser_page_content(url)
+
+        try:
+            self._setup_client()
+            logger.info(f"Fetching: {url}")
+            response = self.client.get(url)
+            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+
+        if 'id="totals_stats"' in response.text:
+            return response.text
+
+        logger.warning("Stats table not found in static HTML, falling back to browser")
+        return self._get_browser_page_content(url)
+
+    def _get_browser_page_content(self, url):
         """
         Fetch HTML content from a URL using Selenium.
         """
@@ -48,12 +101,15 @@ class NBAPlayerStatsScraper:
             logger.info(f"Fetching: {url}")
             self.driver.get(url)
 
-            # Wait for the table to load
+            # Wait for the table to load (returns as soon as it is present)
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, "totals_stats"))
             )
 
-            time.sleep(self.request_delay)
+            # Make sure the document has finished loading before reading the source
+            WebDriverWait(self.driver, 5).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
             return self.driver.page_source
         except Exception as e:
             logger.error(f"Error fetching {url}: {e}")
@@ -61,8 +117,11 @@ class NBAPlayerStatsScraper:
 
     def close(self):
         """
-        Close the browser driver.
+        Close the HTTP client and browser driver.
         """
+        if self.client:
+            self.client.close()
+            logger.info("HTTP client closed")
         if self.driver:
             self.driver.quit()
             logger.info("Browser closed")
@@ -75,75 +134,217 @@ class NBAPlayerStatsScraper:
             season_year: The ending year of the season (e.g., 2025 for 2024-25 season)
         
         Returns:
-            list of dictionaries containing player stats
+            pandas DataFrame containing player stats (one row per player row)
         """
         url = f"{self.base_url}/leagues/NBA_{season_year}_totals.html"
         
-        html_content = self.get_page_content(url)
-        if not html_content:
-            return []
+        html_content = self._read_cached_page(season_year)
+        if html_content is None:
+            html_content = self.get_page_content(url)
+            if not html_content:
+                return pd.DataFrame()
+            self._write_cached_page(season_year, html_content)
         
-        soup = BeautifulSoup(html_content, 'lxml')
+        scraped_at = datetime.now().isoformat()
+        return self._parse_season_html(html_content, season_year, scraped_at)
+    
+    def _cache_path(self, season_year):
+        """
+        Path of the cached raw HTML for a season.
+        """
+        return os.path.join(self.cache_dir, f"totals_{season_year}.html")
+    
+    def _read_cached_page(self, season_year):
+        """
+        Return cached raw HTML for a season if it is younger than cache_max_age, else None.
+        """
+        if not self.cache_dir:
+            return None
+        
+        cache_path = self._cache_path(season_year)
+        try:
+            if time.time() - os.path.getmtime(cache_path) >= self.cache_max_age:
+                return None
+            with open(cache_path, encoding='utf-8') as f:
+                html_content = f.read()
+        except OSError:
+            return None
+        
+        logger.info(f"Using cached page: {cache_path}")
+        return html_content
+    
+    def _write_cached_page(self, season_year, html_content):
+        """
+        Save raw HTML for a season to the cache directory.
+        """
+        if not self.cache_dir:
+            return
+        
+        cache_path = self._cache_path(season_year)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            logger.info(f"Cached page: {cache_path}")
+        except OSError as e:
+            logger.warning(f"Could not cache page {cache_path}: {e}")
+    
+    async def scrape_seasons(self, season_years):
+        """
+        Scrape player season totals for several seasons concurrently.
+        
+        Pages are fetched with an async HTTP client (at most max_concurrent in flight,
+        with request starts spaced request_delay seconds apart to respect the site's
+        rate limit) and parsed in a process pool, since HTML parsing is CPU-bound.
+        Like scrape_season_totals, pages come from the raw HTML cache when fresh and
+        fall back to Selenium when the static HTML lacks the stats table.
+        
+        Args:
+            season_years: Iterable of season ending years (e.g., range(2005, 2026))
+        
+        Returns:
+            dict mapping season year to a DataFrame containing player stats
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        rate_lock = asyncio.Lock()
+        browser_lock = asyncio.Lock()
+        next_request_at = loop.time()
+        
+        async def fetch_and_parse(client, pool, season_year):
+            url = f"{self.base_url}/leagues/NBA_{season_year}_totals.html"
+            
+            # Cached pages skip the network (and the rate limit) entirely
+            html_content = self._read_cached_page(season_year)
+            if html_content is None:
+                html_content = await fetch_page(client, season_year, url)
+                if not html_content:
+                    return season_year, pd.DataFrame()
+                self._write_cached_page(season_year, html_content)
+            
+            players = await loop.run_in_executor(pool, _parse_season_html_worker, html_content, season_year)
+            return season_year, players
+        
+        async def fetch_page(client, season_year, url):
+            nonlocal next_request_at
+            
+            async with semaphore:
+                # Reserve the next request slot, then wait for it outside the lock
+                async with rate_lock:
+                    start_at = max(loop.time(), next_request_at)
+                    next_request_at = start_at + self.request_delay
+                await asyncio.sleep(start_at - loop.time())
+                
+                if not self.use_browser:
+                    try:
+                        logger.info(f"Fetching: {url}")
+                        response = await client.get(url)
+                        response.raise_for_status()
+                    except Exception as e:
+                        logger.error(f"Error fetching {url}: {e}")
+                        return None
+                    
+                    if 'id="totals_stats"' in response.text:
+                        return response.text
+                    logger.warning(f"Stats table not found in static HTML for {season_year}, falling back to browser")
+                
+                # Same Selenium fallback as get_page_content; the single driver
+                # is not thread-safe, so browser fetches run one at a time
+                async with browser_lock:
+                    return await loop.run_in_executor(None, self._get_browser_page_content, url)
+        
+        async with httpx.AsyncClient(
+            headers={'User-Agent': USER_AGENT},
+            timeout=10,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=8)
+        ) as client:
+            with ProcessPoolExecutor() as pool:
+                results = await asyncio.gather(
+                    *(fetch_and_parse(client, pool, year) for year in season_years)
+                )
+        
+        return dict(results)
+    
+    def _parse_season_html(self, html_content, season_year, scraped_at=None):
+        """
+        Parse the totals_stats table from a season totals page.
+        
+        Every row shares the table's schema, so values are accumulated column-wise
+        (one list per stat) and the DataFrame is built directly from the columns.
+        season_year and scraped_at are constant per page and added as broadcast columns.
+        
+        Returns:
+            pandas DataFrame containing player stats
+        """
+        root = lxml.html.fromstring(html_content)
         
         # Find the stats table
         # Basketball Reference uses id="totals_stats" for this table
-        stats_table = soup.find('table', {'id': 'totals_stats'})
+        tables = root.xpath('//table[@id="totals_stats"]')
         
-        if not stats_table:
+        if not tables:
             logger.error("Could not find stats table on page")
-            return []
+            return pd.DataFrame()
         
-        players = []
+        stats_table = tables[0]
         
         # Get table headers to understand column structure
         headers = []
-        thead = stats_table.find('thead')
-        if thead:
-            header_row = thead.find_all('tr')[-1]  # Get the last header row (has actual column names)
-            headers = [th.get('data-stat', th.text) for th in header_row.find_all('th')]
+        header_rows = stats_table.xpath('./thead/tr')
+        if header_rows:
+            header_row = header_rows[-1]  # Get the last header row (has actual column names)
+            headers = [th.get('data-stat', th.text_content()) for th in header_row.xpath('./th')]
         
         logger.info(f"Found {len(headers)} columns: {headers[:10]}...")  # Show first 10
         
         # Get table body
-        tbody = stats_table.find('tbody')
-        if not tbody:
+        if not stats_table.xpath('./tbody'):
             logger.error("Could not find table body")
-            return []
+            return pd.DataFrame()
         
-        rows = tbody.find_all('tr', class_=lambda x: x != 'thead')  # Skip header rows in body
+        # Skip header rows in body (Basketball Reference repeats headers)
+        rows = stats_table.xpath('./tbody/tr[not(contains(@class, "thead"))]')
         
         logger.info(f"Found {len(rows)} player rows")
         
+        # One list per output column; the player link and name come before the name cell
+        column_names = []
+        for stat_name in headers:
+            if stat_name in ['player', 'name_display']:
+                column_names += ['player_url', 'player']
+            column_names.append(stat_name)
+        columns = {name: [] for name in column_names}
+        
         for row in rows:
             try:
-                # Skip rows that are just headers (Basketball Reference repeats headers)
-                if 'thead' in row.get('class', []):
+                player_data = self._parse_player_row(row)
+                if not player_data:
                     continue
                 
-                player_data = self._parse_player_row(row, headers, season_year)
-                if player_data:
-                    players.append(player_data)
+                for name, values in columns.items():
+                    values.append(player_data.get(name))
                     
             except Exception as e:
                 logger.error(f"Error parsing row: {e}")
                 continue
         
+        players = pd.DataFrame(columns)
+        players.insert(0, 'season_year', season_year)
+        players.insert(1, 'scraped_at', scraped_at or datetime.now().isoformat())
         logger.info(f"Successfully parsed {len(players)} players")
         return players
     
-    def _parse_player_row(self, row, headers, season_year):
+    def _parse_player_row(self, row):
         """
-        Parse a single player row from the stats table.
+        Parse a single player row from the stats table into a data-stat -> value map.
 
         Basketball Reference uses data-stat attributes which makes parsing easier!
         """
-        player_data = {
-            'season_year': season_year,
-            'scraped_at': datetime.now().isoformat()
-        }
+        player_data = {}
 
         # Get all cells in the row
-        cells = row.find_all(['th', 'td'])
+        cells = row.xpath('./th|./td')
 
         for cell in cells:
             # Basketball Reference uses 'data-stat' to identify columns
@@ -153,13 +354,13 @@ class NBAPlayerStatsScraper:
                 continue
 
             # Extract text value
-            value = cell.text.strip()
+            value = cell.text_content().strip()
 
             # Handle player name link specially (could be 'player' or 'name_display')
             if stat_name in ['player', 'name_display']:
-                link = cell.find('a')
-                if link:
-                    player_data['player_url'] = self.base_url + link.get('href', '')
+                href = cell.xpath('./a/@href')
+                if href:
+                    player_data['player_url'] = self.base_url + href[0]
                 # Store with consistent key name
                 player_data['player'] = value
 
@@ -173,6 +374,13 @@ class NBAPlayerStatsScraper:
         return None
 
 
+def _parse_season_html_worker(html_content, season_year):
+    """
+    Module-level parse entry point so it can run in a ProcessPoolExecutor worker.
+    """
+    return NBAPlayerStatsScraper()._parse_season_html(html_content, season_year)
+
+
 # Test function
 if __name__ == "__main__":
     scraper = NBAPlayerStatsScraper()
@@ -181,13 +389,13 @@ if __name__ == "__main__":
         # Scrape 2024-25 season
         players = scraper.scrape_season_totals(2025)
 
-        if players:
+        if not players.empty:
             print(f"\nSuccessfully scraped {len(players)} players!")
             print("\n" + "="*80)
             print("Sample of first 3 players:")
             print("="*80)
 
-            for player in players[:3]:
+            for _, player in players.head(3).iterrows():
                 print(f"\nPlayer: {player.get('player', 'Unknown')}")
                 print(f"  Team: {player.get('team_id', 'N/A')}")
                 print(f"  Position: {player.get('pos', 'N/A')}")
@@ -200,10 +408,10 @@ if __name__ == "__main__":
             print("\n" + "="*80)
             print(f"All available stats for first player:")
             print("="*80)
-            for key, value in players[0].items():
+            for key, value in players.iloc[0].items():
                 print(f"  {key}: {value}")
         else:
             print("No players scraped. Check the logs above for errors.")
     finally:
-        # Always close the browser
+        # Always close the HTTP client / browser
         scraper.close()
\ No newline at end of file
@@ -1,11 +1,52 @@
 import pandas as pd
+import numpy as np
 import logging
 from datetime import datetime
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; calculated fields fall back to NumPy
+    njit = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _calculated_fields_kernel(pts, g, trb, ast, mp, fga, fta):
+    """
+    Compute per-game stats and TS% in a single pass over float32 arrays.
+    
+    Returns:
+        Unrounded (pts_per_game, trb_per_game, ast_per_game, mp_per_game, ts_pct);
+        rounding is left to NumPy so both code paths round identically
+    """
+    n = len(pts)
+    pts_per_game = np.empty(n, np.float32)
+    trb_per_game = np.empty(n, np.float32)
+    ast_per_game = np.empty(n, np.float32)
+    mp_per_game = np.empty(n, np.float32)
+    ts_pct = np.empty(n, np.float32)
+    
+    for i in range(n):
+        games = g[i] if g[i] != 0 else np.float32(1)  # Avoid division by zero
+        pts_per_game[i] = pts[i] / games
+        trb_per_game[i] = trb[i] / games
+        ast_per_game[i] = ast[i] / games
+        mp_per_game[i] = mp[i] / games
+        
+        denominator = np.float32(2) * (fga[i] + np.float32(0.44) * fta[i])
+        if denominator != 0:
+            ts_pct[i] = pts[i] / denominator * np.float32(100)
+        else:
+            ts_pct[i] = np.nan
+    
+    return pts_per_game, trb_per_game, ast_per_game, mp_per_game, ts_pct
+
+
+if njit is not None:
+    _calculated_fields_kernel = njit(cache=True)(_calculated_fields_kernel)
+
+
 class NBADataTransformer:
     """
     Transforms raw scraped NBA data into clean, analysis-ready format.
@@ -32,24 +73,40 @@ class NBADataTransformer:
             'pts'  # Points
         ]
         
+        # Storage dtypes, applied once counting stats have been filled. Counts are
+        # whole numbers so int32 is exact; percentages keep float64. Low-cardinality
+        # labels are categorical.
+        counting_dtypes = {col: 'int32' for col in [
+            'g', 'gs', 'mp', 'fg', 'fga', 'fg3', 'fg3a', 'fg2', 'fg2a',
+            'ft', 'fta', 'orb', 'drb', 'trb', 'ast', 'stl', 'blk', 'tov', 'pf', 'pts'
+        ]}
+        self.column_dtypes = {
+            **counting_dtypes,
+            'team_id': 'category',
+            'pos': 'category'
+        }
+        
     def transform(self, raw_data):
         """
         Main transformation pipeline.
         
         Args:
-            raw_data: List of dictionaries from scraper
+            raw_data: DataFrame from scraper (a list of dictionaries is also accepted)
         
         Returns:
             pandas DataFrame with cleaned data
         """
-        if not raw_data:
+        if raw_data is None or len(raw_data) == 0:
             logger.warning("No data to transform")
             return pd.DataFrame()
         
         logger.info(f"Starting transformation of {len(raw_data)} records")
 
         # Convert to DataFrame
-        df = pd.DataFrame(raw_data)
+        if isinstance(raw_data, pd.DataFrame):
+            df = raw_data.copy()
+        else:
+            df = pd.DataFrame.from_records(raw_data)
 
         logger.info(f"Initial shape: {df.shape}")
         logger.info(f"Columns: {df.columns.tolist()}")
@@ -105,15 +162,11 @@ class NBADataTransformer:
             logger.info(f"Found {len(duplicates)} duplicate player entries (traded players)")
             
             # Keep only 'TOT' rows for traded players, or first occurrence if no TOT
-            def keep_row(group):
-                # If there's a TOT row, keep only that
-                tot_rows = group[group['team_id'] == 'TOT']
-                if len(tot_rows) > 0:
-                    return tot_rows
-                # Otherwise keep the first occurrence
-                return group.head(1)
+            tot_mask = df['team_id'].eq('TOT')
+            players_with_tot = df.loc[tot_mask, 'player'].unique()
+            keep = tot_mask | (~df['player'].isin(players_with_tot) & ~df.duplicated(subset=['player'], keep='first'))
             
-            df = df.groupby('player', as_index=False).apply(keep_row).reset_index(drop=True)
+            df = df.loc[keep].reset_index(drop=True)
         
         final_count = len(df)
         logger.info(f"Removed {initial_count - final_count} duplicate rows")
@@ -126,14 +179,9 @@ class NBADataTransformer:
         """
         logger.info("Converting data types...")
         
-        for col in self.numeric_columns:
-            if col in df.columns:
-                # Convert to numeric, coercing errors to NaN
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Season year should be integer
-        if 'season_year' in df.columns:
-            df['season_year'] = pd.to_numeric(df['season_year'], errors='coerce')
+        # Convert all numeric columns (plus season year) in one pass, coercing errors to NaN
+        cols = [col for col in self.numeric_columns + ['season_year'] if col in df.columns]
+        df[cols] = df[cols].apply(pd.to_numeric, errors='coerce')
         
         logger.info("Data type conversion complete")
         
@@ -146,7 +194,8 @@ class NBADataTransformer:
         logger.info("Handling missing values...")
         
         # Log missing value counts
-        missing_counts = df[self.numeric_columns].isnull().sum()
+        numeric_cols = [col for col in self.numeric_columns if col in df.columns]
+        missing_counts = df[numeric_cols].isna().sum()
         if missing_counts.sum() > 0:
             logger.info(f"Missing values found:\n{missing_counts[missing_counts > 0]}")
         
@@ -158,9 +207,11 @@ class NBADataTransformer:
                          'ft', 'fta', 'orb', 'drb', 'trb', 'ast', 'stl', 'blk', 
                          'tov', 'pf', 'pts', 'mp']
         
-        for col in counting_stats:
-            if col in df.columns:
-                df[col] = df[col].fillna(0)
+        cols_present = [col for col in counting_stats if col in df.columns]
+        df[cols_present] = df[cols_present].fillna(0)
+        
+        # Apply declared storage dtypes (int32 counts, categorical labels)
+        df = df.astype({col: dtype for col, dtype in self.column_dtypes.items() if col in df.columns})
         
         return df
     
@@ -170,32 +221,44 @@ class NBADataTransformer:
         """
         logger.info("Adding calculated fields...")
         
-        # Points per game
-        if 'pts' in df.columns and 'g' in df.columns:
-            df['pts_per_game'] = df['pts'] / df['g'].replace(0, 1)  # Avoid division by zero
-            df['pts_per_game'] = df['pts_per_game'].round(2)
-        
-        # Rebounds per game
-        if 'trb' in df.columns and 'g' in df.columns:
-            df['trb_per_game'] = df['trb'] / df['g'].replace(0, 1)
-            df['trb_per_game'] = df['trb_per_game'].round(2)
-        
-        # Assists per game
-        if 'ast' in df.columns and 'g' in df.columns:
-            df['ast_per_game'] = df['ast'] / df['g'].replace(0, 1)
-            df['ast_per_game'] = df['ast_per_game'].round(2)
-        
-        # Minutes per game
-        if 'mp' in df.columns and 'g' in df.columns:
-            df['mp_per_game'] = df['mp'] / df['g'].replace(0, 1)
-            df['mp_per_game'] = df['mp_per_game'].round(1)
+        # Fast path: one compiled pass over all inputs (numba installed, all columns present)
+        kernel_columns = ['pts', 'g', 'trb', 'ast', 'mp', 'fga', 'fta']
+        if njit is not None and all(col in df.columns for col in kernel_columns):
+            arrays = [df[col].to_numpy(dtype=np.float32) for col in kernel_columns]
+            fields = [('pts_per_game', 2), ('trb_per_game', 2), ('ast_per_game', 2), ('mp_per_game', 1), ('ts_pct', 1)]
+            for (field, decimals), values in zip(fields, _calculated_fields_kernel(*arrays)):
+                df[field] = np.round(values.astype(np.float64), decimals)
+            
+            logger.info(f"Added {len(fields)} calculated fields")
+            
+            return df
+        
+        # Per-game stats, computed on float32 arrays in one block; results are
+        # widened to float64 before rounding so the stored values are exact
+        # 2-decimal doubles (a rounded float32 widens to e.g. 25.670000076)
+        per_game_fields = [
+            ('pts', 'pts_per_game', 2),  # Points per game
+            ('trb', 'trb_per_game', 2),  # Rebounds per game
+            ('ast', 'ast_per_game', 2),  # Assists per game
+            ('mp', 'mp_per_game', 1)  # Minutes per game
+        ]
+        if 'g' in df.columns:
+            g = df['g'].to_numpy(dtype=np.float32)
+            g_safe = np.where(g == 0, np.float32(1), g)  # Avoid division by zero
+            
+            for col, field, decimals in per_game_fields:
+                if col in df.columns:
+                    per_game = df[col].to_numpy(dtype=np.float32) / g_safe
+                    df[field] = np.round(per_game.astype(np.float64), decimals)
         
         # True Shooting Percentage (advanced stat)
-        # TS% = PTS / (2 * (FGA + 0.44 * FTA))
+        # TS% = PTS / (2 * (FGA + 0.44 * FTA)), undefined (NaN) with no shot attempts
         if all(col in df.columns for col in ['pts', 'fga', 'fta']):
-            denominator = 2 * (df['fga'] + 0.44 * df['fta'])
-            df['ts_pct'] = (df['pts'] / denominator.replace(0, 1)) * 100
-            df['ts_pct'] = df['ts_pct'].round(1)
+            pts, fga, fta = (df[col].to_numpy(dtype=np.float32) for col in ['pts', 'fga', 'fta'])
+            denominator = 2 * (fga + np.float32(0.44) * fta)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ts_pct = np.where(denominator == 0, np.nan, pts / denominator * 100)
+            df['ts_pct'] = np.round(ts_pct.astype(np.float64), 1)
         
         logger.info(f"Added {5} calculated fields")
         
@@ -209,10 +272,9 @@ class NBADataTransformer:
         
         # Check for negative values (shouldn't happen in basketball stats)
         numeric_cols = df.select_dtypes(include=['number']).columns
-        for col in numeric_cols:
-            negative_count = (df[col] < 0).sum()
-            if negative_count > 0:
-                logger.warning(f"Found {negative_count} negative values in {col}")
+        negative_counts = df[numeric_cols].lt(0).sum()
+        for col, negative_count in negative_counts[negative_counts > 0].items():
+            logger.warning(f"Found {negative_count} negative values in {col}")
         
         # Check for unrealistic values
         if 'age' in df.columns:
@@ -226,12 +288,11 @@ class NBADataTransformer:
                 logger.warning(f"Found {len(high_scorers)} players averaging >50 PPG (possible data issue)")
         
         # Check percentage ranges (should be 0-100 or 0-1 depending on format)
-        pct_cols = [col for col in df.columns if 'pct' in col]
-        for col in pct_cols:
-            if col in df.columns:
-                out_of_range = df[(df[col] < 0) | (df[col] > 100)].dropna()
-                if len(out_of_range) > 0:
-                    logger.warning(f"Found {len(out_of_range)} out-of-range values in {col}")
+        pct_cols = [col for col in numeric_cols if 'pct' in col]
+        pct_values = df[pct_cols]
+        out_of_range = (pct_values.lt(0) | pct_values.gt(100)).sum()
+        for col, out_of_range_count in out_of_range[out_of_range > 0].items():
+            logger.warning(f"Found {out_of_range_count} out-of-range values in {col}")
         
         logger.info("Quality checks complete")
 
@@ -251,7 +312,7 @@ if __name__ == "__main__":
     scraper = NBAPlayerStatsScraper()
     raw_data = scraper.scrape_season_totals(2025)
     
-    if raw_data:
+    if not raw_data.empty:
         print(f"Scraped {len(raw_data)} players\n")
         
         # Transform data
@@ -6,197 +6,509 @@ Author: Jason Amar
 Date: 2025-10-20
 """
 
+import csv
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+import mmap
 from pathlib import Path
 
+try:
+    import polars as pl
+except ImportError:  # polars is optional; only needed for engine='polars'
+    pl = None
+
+# Benchmark result fields, in report column order
+RESULT_COLUMNS = ('format', 'operation', 'time_ns', 'parse_ns', 'convert_ns', 'file_size_mb', 'rows')
+
+# Rows per Parquet row group / write batch
+PARQUET_ROW_GROUP_SIZE = 256 * 1024
+
 class FileFormatConverter:
     """
     Handles reading, writing, and converting between different file formats
-    Also benchmarks performance metrics
+    Also benchmarks performance metrics, with either PyArrow/pandas or Polars as the engine
     """
     
-    def __init__(self, base_path='test_data'):
+    def __init__(self, base_path='test_data', engine='pandas'):
         """
         Initialize converter with base data path
         
         Args:
             base_path: Directory containing data files
+            engine: 'pandas' (PyArrow readers/writers, pandas DataFrames) or
+                'polars' (Polars' native readers/writers, Polars DataFrames)
         """
+        if engine not in ('pandas', 'polars'):
+            raise ValueError(f"Unknown engine: {engine!r} (expected 'pandas' or 'polars')")
+        if engine == 'polars' and pl is None:
+            raise ImportError("engine='polars' requires the polars package")
+        
         self.base_path = Path(base_path)
-        self.results = []
+        self.engine = engine
+        # Benchmark results are kept column-wise (one list per field), not as a dict per row
+        self._cols = {name: [] for name in RESULT_COLUMNS}
+        self._size_cache = None  # File name -> size in bytes, filled by one scandir pass
+        self._csv_schemas = {}  # CSV path -> Arrow schema inferred on its first read
+        self.concurrent_read_ns = None  # Wall clock of read_all_concurrently(), kept out of _cols
+    
+    def _record(self, fmt, operation, time_ns, file_size_mb, rows, parse_ns=None, convert_ns=None):
+        """
+        Append one read/write measurement to the result columns
+        
+        Args:
+            fmt: File format name ('CSV', 'JSON', 'Parquet')
+            operation: 'read' or 'write'
+            time_ns: Total time in nanoseconds
+            file_size_mb: File size in MB
+            rows: Number of rows read or written
+            parse_ns: Optional parse time in nanoseconds (CSV reads)
+            convert_ns: Optional conversion time in nanoseconds (CSV reads)
+        """
+        values = (fmt, operation, time_ns, parse_ns, convert_ns, file_size_mb, rows)
+        for name, value in zip(RESULT_COLUMNS, values):
+            self._cols[name].append(value)
+    
+    def warm_up(self):
+        """
+        Run each reader/writer code path once on a tiny in-memory table so lazy
+        imports, codec setup and thread pool start-up are not part of the timings
+        """
+        table = pa.table({'id': [1, 2], 'name': ['a', 'b']})
+        
+        csv_buffer = pa.BufferOutputStream()
+        pacsv.write_csv(table, csv_buffer)
+        pacsv.read_csv(pa.BufferReader(csv_buffer.getvalue())).to_pandas()
+        
+        parquet_buffer = pa.BufferOutputStream()
+        pq.write_table(table, parquet_buffer, compression='zstd')
+        pq.ParquetFile(pa.BufferReader(parquet_buffer.getvalue())).read().to_pandas()
+        
+        pa.Table.from_pylist(orjson.loads(orjson.dumps(table.to_pylist()))).to_pandas()
+        
+        if self.engine == 'polars':
+            pl.read_csv(csv_buffer.getvalue().to_pybytes())
+            pl.from_arrow(table).write_parquet(pa.BufferOutputStream(), compression='zstd')
     
-    def get_file_size(self, filepath):
+    def _to_polars(self, df):
+        """
+        Convert a pandas DataFrame or pyarrow Table to a Polars DataFrame
+        
+        Args:
+            df: pandas DataFrame, pyarrow Table or Polars DataFrame
+        
+        Returns:
+            Polars DataFrame
+        """
+        if isinstance(df, pl.DataFrame):
+            return df
+        if isinstance(df, pa.Table):
+            return pl.from_arrow(df)
+        return pl.from_pandas(df)
+    
+    def _refresh_sizes(self):
+        """
+        Stat every file in base_path in a single os.scandir pass
+        """
+        with os.scandir(self.base_path) as entries:
+            self._size_cache = {entry.name: entry.stat().st_size for entry in entries if entry.is_file()}
+    
+    def get_file_size(self, filepath, cached=True):
         """
         Get file size in MB
         
         Args:
             filepath: Path to file
+            cached: Use the scandir size cache (pass False for files just written)
         
         Returns:
             File size in MB
         """
-        size_bytes = os.path.getsize(filepath)
+        filepath = Path(filepath)
+        size_bytes = None
+        if cached and filepath.parent == self.base_path:
+            if self._size_cache is None:
+                self._refresh_sizes()
+            size_bytes = self._size_cache.get(filepath.name)
+        
+        if size_bytes is None:
+            size_bytes = os.stat(filepath).st_size
+            if self._size_cache is not None and filepath.parent == self.base_path:
+                self._size_cache[filepath.name] = size_bytes
         size_mb = size_bytes / (1024 * 1024)
         return size_mb
     
-    def read_csv(self, filename='sample_data.csv'):
+    def peek_shape(self, filename):
         """
-        Read CSV file and measure performance
+        Get the (rows, columns) shape of a data file without decoding its values
+        
+        Parquet answers from the footer metadata, CSV from a newline count
+        (fields with embedded newlines are not supported), and JSON records are
+        parsed with orjson and only counted.
+        
+        Args:
+            filename: CSV, JSON or Parquet file name
         
         Returns:
-            tuple: (DataFrame, read_time_seconds)
+            tuple: (rows, columns)
+        """
+        filepath = self.base_path / filename
+        suffix = filepath.suffix.lower()
+        
+        if suffix == '.parquet':
+            metadata = pq.read_metadata(filepath)
+            return metadata.num_rows, metadata.num_columns
+        
+        if suffix == '.json':
+            records = orjson.loads(filepath.read_bytes())
+            return len(records), len(records[0]) if records else 0
+        
+        if suffix == '.csv':
+            with open(filepath, 'rb') as f:
+                header = f.readline()
+                if not header:
+                    return 0, 0
+                
+                rows = 0
+                last_chunk = b''
+                while chunk := f.read(1 << 20):
+                    rows += chunk.count(b'\n')
+                    last_chunk = chunk
+                if last_chunk and not last_chunk.endswith(b'\n'):
+                    rows += 1  # Final row has no trailing newline
+            
+            columns = len(next(csv.reader([header.decode('utf-8-sig')])))
+            return rows, columns
+        
+        raise ValueError(f"Unsupported file type: {filepath.suffix}")
+    
+    def read_csv(self, filename='sample_data.csv', as_arrow=False, record=True):
+        """
+        Read CSV file with PyArrow's multithreaded reader and measure performance
+        
+        The file is memory-mapped and handed to Arrow as a zero-copy buffer, so
+        the parser reads straight from the page cache. Parse time (CSV -> Arrow)
+        and conversion time (Arrow -> pandas) are recorded separately; the read
+        time is their total. The schema inferred on a file's first read is reused
+        as explicit column types on later reads, so they skip type inference.
+        With engine='polars', Polars' parser reads the file
+        and returns a Polars DataFrame.
+        
+        Args:
+            filename: CSV file name
+            as_arrow: Return the pyarrow Table and skip the pandas conversion
+            record: Add the timing to the per-format results
+        
+        Returns:
+            tuple: (DataFrame or pyarrow.Table, read_time_seconds)
         """
         filepath = self.base_path / filename
         print(f"\n📄 Reading CSV: {filepath}")
         
-        start_time = time.time()
-        df = pd.read_csv(filepath)
-        read_time = time.time() - start_time
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=32 << 20)
+        
+        start_ns = time.perf_counter_ns()
+        if self.engine == 'polars':
+            # Polars parses on all cores and skips rechunking by default
+            frame = pl.read_csv(filepath)
+            parse_ns = time.perf_counter_ns() - start_ns
+            
+            convert_start_ns = time.perf_counter_ns()
+            data = frame.to_arrow() if as_arrow else frame
+            convert_ns = time.perf_counter_ns() - convert_start_ns
+        else:
+            schema = self._csv_schemas.get(filepath)
+            convert_options = pacsv.ConvertOptions(column_types=schema) if schema is not None else None
+            table = self._read_csv_mmap(filepath, read_options, convert_options)
+            parse_ns = time.perf_counter_ns() - start_ns
+            self._csv_schemas.setdefault(filepath, table.schema)
+            
+            if as_arrow:
+                data, convert_ns = table, 0
+            else:
+                convert_start_ns = time.perf_counter_ns()
+                data = table.to_pandas(split_blocks=True, self_destruct=True)
+                convert_ns = time.perf_counter_ns() - convert_start_ns
+                del table
+        read_ns = parse_ns + convert_ns
+        read_time = read_ns / 1e9
         
         file_size = self.get_file_size(filepath)
         
-        print(f"   ✅ Read {len(df):,} rows in {read_time:.4f} seconds")
+        print(f"   ✅ Read {len(data):,} rows in {read_time:.4f} seconds "
+              f"(parse {parse_ns / 1e9:.4f}s + convert {convert_ns / 1e9:.4f}s)")
         print(f"   📦 File size: {file_size:.2f} MB")
         
-        self.results.append({
-            'format': 'CSV',
-            'operation': 'read',
-            'time_seconds': read_time,
-            'file_size_mb': file_size,
-            'rows': len(df)
-        })
+        if record:
+            self._record('CSV', 'read', read_ns, file_size, len(data), parse_ns=parse_ns, convert_ns=convert_ns)
         
-        return df, read_time
+        return data, read_time
     
-    def read_json(self, filename='sample_data.json'):
+    def _read_csv_mmap(self, filepath, read_options, convert_options=None):
+        """
+        Parse a CSV file into an Arrow table through a read-only memory map
+        
+        Args:
+            filepath: Path to CSV file
+            read_options: pyarrow.csv.ReadOptions
+            convert_options: Optional pyarrow.csv.ConvertOptions (e.g. known column types)
+        
+        Returns:
+            pyarrow Table
+        """
+        with open(filepath, 'rb') as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                return pacsv.read_csv(filepath, read_options=read_options, convert_options=convert_options)
+        
+        with mapped:
+            if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)  # Hint aggressive readahead
+            
+            buffer = pa.py_buffer(mapped)
+            reader = pa.BufferReader(buffer)
+            table = pacsv.read_csv(reader, read_options=read_options, convert_options=convert_options)
+            
+            # Release the buffer exports before the map is closed
+            reader.close()
+            del reader, buffer
+        
+        return table
+    
+    def read_json(self, filename='sample_data.json', as_arrow=False, record=True):
         """
         Read JSON file and measure performance
         
+        Parses the records array with orjson and builds the frame column-wise
+        through Arrow instead of pd.read_json's row-by-row construction.
+        With engine='polars', Polars' JSON reader is used instead.
+        
+        Args:
+            filename: JSON file name
+            as_arrow: Return the pyarrow Table and skip the pandas conversion
+            record: Add the timing to the per-format results
+        
         Returns:
-            tuple: (DataFrame, read_time_seconds)
+            tuple: (DataFrame or pyarrow.Table, read_time_seconds)
         """
         filepath = self.base_path / filename
         print(f"\n📄 Reading JSON: {filepath}")
         
-        start_time = time.time()
-        df = pd.read_json(filepath)
-        read_time = time.time() - start_time
+        start_ns = time.perf_counter_ns()
+        if self.engine == 'polars':
+            frame = pl.read_json(filepath)
+            data = frame.to_arrow() if as_arrow else frame
+        else:
+            records = orjson.loads(filepath.read_bytes())
+            table = pa.Table.from_pylist(records)
+            data = table if as_arrow else table.to_pandas(self_destruct=True)
+        read_ns = time.perf_counter_ns() - start_ns
+        read_time = read_ns / 1e9
         
         file_size = self.get_file_size(filepath)
         
-        print(f"   ✅ Read {len(df):,} rows in {read_time:.4f} seconds")
+        print(f"   ✅ Read {len(data):,} rows in {read_time:.4f} seconds")
         print(f"   📦 File size: {file_size:.2f} MB")
         
-        self.results.append({
-            'format': 'JSON',
-            'operation': 'read',
-            'time_seconds': read_time,
-            'file_size_mb': file_size,
-            'rows': len(df)
-        })
+        if record:
+            self._record('JSON', 'read', read_ns, file_size, len(data))
         
-        return df, read_time
+        return data, read_time
     
-    def read_parquet(self, filename='sample_data.parquet'):
+    def read_parquet(self, filename='sample_data.parquet', columns=None, as_arrow=False, record=True):
         """
         Read Parquet file and measure performance
         
+        Streams record batches (one row group's worth of memory at a time) and
+        only decodes the requested columns. Column chunks are pre-buffered so
+        adjacent byte ranges are coalesced into fewer, larger reads.
+        With engine='polars', Polars' Parquet reader is used instead.
+        
+        Args:
+            filename: Parquet file name
+            columns: Optional list of columns to read (default: all)
+            as_arrow: Return the pyarrow Table and skip the pandas conversion
+            record: Add the timing to the per-format results
+        
         Returns:
-            tuple: (DataFrame, read_time_seconds)
+            tuple: (DataFrame or pyarrow.Table, read_time_seconds)
         """
         filepath = self.base_path / filename
         print(f"\n📄 Reading Parquet: {filepath}")
         
-        start_time = time.time()
-        df = pd.read_parquet(filepath, engine='pyarrow')
-        read_time = time.time() - start_time
+        start_ns = time.perf_counter_ns()
+        if self.engine == 'polars':
+            frame = pl.read_parquet(filepath, columns=columns)
+            data = frame.to_arrow() if as_arrow else frame
+        else:
+            parquet_file = pq.ParquetFile(filepath, pre_buffer=True)
+            schema = parquet_file.schema_arrow
+            if columns is not None:
+                schema = pa.schema([schema.field(col) for col in columns], metadata=schema.metadata)
+            
+            batches = parquet_file.iter_batches(batch_size=65536, columns=columns, use_threads=True)
+            table = pa.Table.from_batches(batches, schema=schema)
+            data = table if as_arrow else table.to_pandas(split_blocks=True, self_destruct=True)
+        read_ns = time.perf_counter_ns() - start_ns
+        read_time = read_ns / 1e9
         
         file_size = self.get_file_size(filepath)
         
-        print(f"   ✅ Read {len(df):,} rows in {read_time:.4f} seconds")
+        print(f"   ✅ Read {len(data):,} rows in {read_time:.4f} seconds")
         print(f"   📦 File size: {file_size:.2f} MB")
         
-        self.results.append({
-            'format': 'Parquet',
-            'operation': 'read',
-            'time_seconds': read_time,
-            'file_size_mb': file_size,
-            'rows': len(df)
-        })
+        if record:
+            self._record('Parquet', 'read', read_ns, file_size, len(data))
         
-        return df, read_time
+        return data, read_time
+    
+    def read_all_concurrently(self, as_arrow=True):
+        """
+        Read the CSV, JSON and Parquet samples at the same time and measure the wall clock
+        
+        The readers compete for CPU, the GIL and disk, so their individual times
+        are not comparable and are left out of the per-format results; only the
+        total wall-clock time is kept, in concurrent_read_ns.
+        
+        Args:
+            as_arrow: Return pyarrow Tables and skip the pandas conversion
+        
+        Returns:
+            tuple: ((csv_data, json_data, parquet_data), wall_time_seconds)
+        """
+        print("\n⏱️  Reading CSV, JSON and Parquet concurrently")
+        
+        start_ns = time.perf_counter_ns()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(reader, as_arrow=as_arrow, record=False)
+                for reader in (self.read_csv, self.read_json, self.read_parquet)
+            ]
+            data = tuple(future.result()[0] for future in futures)
+        self.concurrent_read_ns = time.perf_counter_ns() - start_ns
+        wall_time = self.concurrent_read_ns / 1e9
+        
+        print(f"   ✅ Concurrent read of all formats: {wall_time:.4f} seconds (wall clock)")
+        
+        return data, wall_time
     
     def write_csv(self, df, filename='output.csv'):
-        """Write DataFrame to CSV and measure performance"""
+        """Write DataFrame to CSV with PyArrow's C++ writer (or Polars') and measure performance"""
         filepath = self.base_path / filename
         print(f"\n💾 Writing CSV: {filepath}")
         
-        start_time = time.time()
-        df.to_csv(filepath, index=False)
-        write_time = time.time() - start_time
+        start_ns = time.perf_counter_ns()
+        if self.engine == 'polars':
+            self._to_polars(df).write_csv(filepath)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pacsv.write_csv(table, filepath, write_options=pacsv.WriteOptions(include_header=True, batch_size=1 << 16))
+        write_ns = time.perf_counter_ns() - start_ns
+        write_time = write_ns / 1e9
         
-        file_size = self.get_file_size(filepath)
+        file_size = self.get_file_size(filepath, cached=False)
         
         print(f"   ✅ Wrote {len(df):,} rows in {write_time:.4f} seconds")
         print(f"   📦 File size: {file_size:.2f} MB")
         
-        self.results.append({
-            'format': 'CSV',
-            'operation': 'write',
-            'time_seconds': write_time,
-            'file_size_mb': file_size,
-            'rows': len(df)
-        })
+        self._record('CSV', 'write', write_ns, file_size, len(df))
         
         return write_time
     
     def write_json(self, df, filename='output.json'):
-        """Write DataFrame to JSON and measure performance"""
+        """
+        Write DataFrame to JSON and measure performance
+        
+        Serializes records with orjson in chunks of 65,536 rows, so peak memory
+        holds one chunk's Python objects rather than the whole frame's.
+        With engine='polars', Polars writes the records array natively.
+        """
         filepath = self.base_path / filename
         print(f"\n💾 Writing JSON: {filepath}")
         
-        start_time = time.time()
-        df.to_json(filepath, orient='records', date_format='iso')
-        write_time = time.time() - start_time
-        
-        file_size = self.get_file_size(filepath)
+        start_ns = time.perf_counter_ns()
+        if self.engine == 'polars':
+            self._to_polars(df).write_json(filepath)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with open(filepath, 'wb') as f:
+                f.write(b'[')
+                first_chunk = True
+                for batch in table.to_batches(max_chunksize=65536):
+                    if batch.num_rows == 0:
+                        continue
+                    if not first_chunk:
+                        f.write(b',')
+                    # Strip the surrounding brackets so chunks join into one records array
+                    # (nanosecond timestamps come back as pandas Timestamps, which need isoformat)
+                    f.write(orjson.dumps(batch.to_pylist(), default=lambda value: value.isoformat())[1:-1])
+                    first_chunk = False
+                f.write(b']')
+        write_ns = time.perf_counter_ns() - start_ns
+        write_time = write_ns / 1e9
+        
+        file_size = self.get_file_size(filepath, cached=False)
         
         print(f"   ✅ Wrote {len(df):,} rows in {write_time:.4f} seconds")
         print(f"   📦 File size: {file_size:.2f} MB")
         
-        self.results.append({
-            'format': 'JSON',
-            'operation': 'write',
-            'time_seconds': write_time,
-            'file_size_mb': file_size,
-            'rows': len(df)
-        })
+        self._record('JSON', 'write', write_ns, file_size, len(df))
         
         return write_time
     
     def write_parquet(self, df, filename='output.parquet'):
-        """Write DataFrame to Parquet and measure performance"""
+        """
+        Write DataFrame (or pyarrow Table) to Parquet and measure performance
+        
+        Uses zstd (level 3) for tables of 512 KB or more and snappy below that.
+        Integer columns are delta-encoded; all other columns are dictionary-encoded.
+        Batches are streamed through a ParquetWriter one row group at a time,
+        which bounds the encoder's peak memory to a single row group.
+        A pyarrow Table is written as-is, with no pandas round-trip.
+        With engine='polars', Polars' native writer is used (zstd level 3).
+        """
         filepath = self.base_path / filename
         print(f"\n💾 Writing Parquet: {filepath}")
         
-        start_time = time.time()
-        df.to_parquet(filepath, index=False, engine='pyarrow', compression='snappy')
-        write_time = time.time() - start_time
-        
-        file_size = self.get_file_size(filepath)
+        start_ns = time.perf_counter_ns()
+        if self.engine == 'polars':
+            self._to_polars(df).write_parquet(filepath, compression='zstd', compression_level=3, use_pyarrow=False)
+        else:
+            table = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=False)
+            
+            use_zstd = table.nbytes >= 1 << 19
+            int_columns = [field.name for field in table.schema if pa.types.is_integer(field.type)]
+            dictionary_columns = [name for name in table.column_names if name not in int_columns]
+            
+            # Stream row groups of 262,144 rows so only one is being encoded at a time
+            with pq.ParquetWriter(
+                filepath,
+                table.schema,
+                compression='zstd' if use_zstd else 'snappy',
+                compression_level=3 if use_zstd else None,
+                data_page_size=1 << 20,
+                use_dictionary=dictionary_columns,
+                write_statistics=True,
+                column_encoding={col: 'DELTA_BINARY_PACKED' for col in int_columns} or None
+            ) as writer:
+                for batch in table.to_batches(max_chunksize=PARQUET_ROW_GROUP_SIZE):
+                    writer.write_batch(batch, row_group_size=PARQUET_ROW_GROUP_SIZE)
+        write_ns = time.perf_counter_ns() - start_ns
+        write_time = write_ns / 1e9
+        
+        file_size = self.get_file_size(filepath, cached=False)
         
         print(f"   ✅ Wrote {len(df):,} rows in {write_time:.4f} seconds")
         print(f"   📦 File size: {file_size:.2f} MB")
         
-        self.results.append({
-            'format': 'Parquet',
-            'operation': 'write',
-            'time_seconds': write_time,
-            'file_size_mb': file_size,
-            'rows': len(df)
-        })
+        self._record('Parquet', 'write', write_ns, file_size, len(df))
         
         return write_time
     
@@ -204,11 +516,16 @@ class FileFormatConverter:
         """
         Generate comprehensive performance comparison report
         """
-        if not self.results:
+        if not self._cols['format']:
             print("No benchmark results available!")
             return
         
-        results_df = pd.DataFrame(self.results)
+        # Optional columns that were never filled are dropped
+        results_df = pd.DataFrame(self._cols, copy=False).dropna(axis=1, how='all')
+        
+        # Timings are stored as integer nanoseconds; convert to seconds for display only
+        for ns_col in [col for col in results_df.columns if col.endswith('_ns')]:
+            results_df[ns_col.replace('_ns', '_seconds')] = results_df[ns_col] / 1e9
         
         print("\n" + "="*70)
         print("PERFORMANCE BENCHMARK RESULTS")
@@ -221,10 +538,9 @@ class FileFormatConverter:
             print(f"\n{operation.upper()} Performance:")
             print("-" * 70)
             
-            for _, row in op_data.iterrows():
-                print(f"{row['format']:10} | "
-                      f"Time: {row['time_seconds']:.4f}s | "
-                      f"Size: {row['file_size_mb']:.2f} MB")
+            rows = op_data[['format', 'time_seconds', 'file_size_mb']].itertuples(index=False, name=None)
+            print("\n".join(f"{fmt:10} | Time: {seconds:.4f}s | Size: {size_mb:.2f} MB"
+                            for fmt, seconds, size_mb in rows))
         
         # Find winners
         read_data = results_df[results_df['operation'] == 'read']
@@ -240,6 +556,8 @@ class FileFormatConverter:
         print(f"🏆 Fastest Read:  {fastest_read['format']} ({fastest_read['time_seconds']:.4f}s)")
         print(f"🏆 Fastest Write: {fastest_write['format']} ({fastest_write['time_seconds']:.4f}s)")
         print(f"🏆 Smallest File: {smallest_file['format']} ({smallest_file['file_size_mb']:.2f} MB)")
+        if self.concurrent_read_ns is not None:
+            print(f"⏱️  Concurrent read (all formats, wall clock): {self.concurrent_read_ns / 1e9:.4f}s")
         
         # Save results to file
         report_path = 'performance_results.txt'
@@ -251,38 +569,53 @@ class FileFormatConverter:
             f.write(f"Fastest Read:  {fastest_read['format']}\n")
             f.write(f"Fastest Write: {fastest_write['format']}\n")
             f.write(f"Smallest File: {smallest_file['format']}\n")
+            if self.concurrent_read_ns is not None:
+                f.write(f"Concurrent read (all formats, wall clock): {self.concurrent_read_ns / 1e9:.4f}s\n")
         
         print(f"\n📊 Full report saved to: {report_path}")
 
-def main():
+def main(engine='pandas', concurrent_reads=False):
     """
     Main function to run all benchmarks
+    
+    Args:
+        engine: 'pandas' or 'polars' (see FileFormatConverter)
+        concurrent_reads: Also time reading all formats at once (reported
+            separately from the per-format read times)
     """
     print("="*70)
     print("FILE FORMAT CONVERTER & PERFORMANCE BENCHMARKER")
     print("="*70)
     
     # Initialize converter
-    converter = FileFormatConverter()
+    converter = FileFormatConverter(engine=engine)
+    converter.warm_up()
     
-    # Read all formats
+    # Read all formats one at a time so each timing measures its format alone.
+    # Only the CSV table is used afterwards; all stay in Arrow (no pandas conversion).
     print("\n--- READING FILES ---")
-    df_csv, _ = converter.read_csv()
-    df_json, _ = converter.read_json()
-    df_parquet, _ = converter.read_parquet()
+    csv_table, _ = converter.read_csv(as_arrow=True)
+    converter.read_json(as_arrow=True)
+    converter.read_parquet(as_arrow=True)
+    
+    if concurrent_reads:
+        converter.read_all_concurrently()
     
-    # Verify all DataFrames are identical
+    # Verify all files have the same shape (from metadata / line counts, no decoding)
     print("\n--- VERIFYING DATA INTEGRITY ---")
-    if df_csv.shape == df_json.shape == df_parquet.shape:
+    shapes = [converter.peek_shape(name) for name in ('sample_data.csv', 'sample_data.json', 'sample_data.parquet')]
+    if len(set(shapes)) == 1:
         print("✅ All formats contain same number of rows and columns")
     else:
         print("⚠️  Warning: Formats have different shapes!")
     
-    # Write all formats (using CSV data as source)
+    # Write all formats (using CSV data as source); only this table is converted to pandas.
+    # The table is reused for Parquet, so it must not be self-destructed here.
     print("\n--- WRITING FILES ---")
+    df_csv = pl.from_arrow(csv_table) if engine == 'polars' else csv_table.to_pandas(split_blocks=True)
     converter.write_csv(df_csv, 'output.csv')
     converter.write_json(df_csv, 'output.json')
-    converter.write_parquet(df_csv, 'output.parquet')
+    converter.write_parquet(csv_table, 'output.parquet')
     
     # Generate performance report
     converter.generate_performance_report()
@@ -4,15 +4,28 @@ Author: Jason Amar
 Date: 2025-10-20
 """
 
+import atexit
 import logging
-from datetime import datetime
+import logging.handlers
+
+# Buffer file records in memory and write them in batches (flushed when the
+# buffer fills, on ERROR or above, and at exit) instead of one write per record
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+file_handler = logging.FileHandler('app.log')
+file_handler.setFormatter(logging.Formatter(LOG_FORMAT))  # Records are formatted by the target
+buffered_file_handler = logging.handlers.MemoryHandler(
+    capacity=1024,
+    flushLevel=logging.ERROR,
+    target=file_handler
+)
+atexit.register(buffered_file_handler.flush)
 
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,  # Capture all log levels
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler('app.log'),  # Write to file
+        buffered_file_handler,  # Write to file (buffered)
         logging.StreamHandler()  # Also print to console
     ]
 )
@@ -26,30 +39,29 @@ def simulate_data_pipeline():
     """
     logger.info("="*50)
     logger.info("Starting data pipeline")
-    logger.info(f"Pipeline started at: {datetime.now()}")
     
     try:
         # Step 1: Extract
         logger.info("Step 1: Extracting data from source")
         records_extracted = 1000
-        logger.info(f"Successfully extracted {records_extracted} records")
+        logger.info("Successfully extracted %d records", records_extracted)
         
         # Step 2: Transform
         logger.info("Step 2: Transforming data")
         logger.debug("Applying data cleaning rules...")
         logger.debug("Removing duplicates...")
         records_after_transform = 950
-        logger.warning(f"Removed {records_extracted - records_after_transform} duplicate records")
+        logger.warning("Removed %d duplicate records", records_extracted - records_after_transform)
         
         # Step 3: Validate
         logger.info("Step 3: Validating data quality")
         null_count = 5
         if null_count > 0:
-            logger.warning(f"Found {null_count} null values in critical columns")
+            logger.warning("Found %d null values in critical columns", null_count)
         
         # Step 4: Load
         logger.info("Step 4: Loading data to destination")
-        logger.info(f"Successfully loaded {records_after_transform} records")
+        logger.info("Successfully loaded %d records", records_after_transform)
         
         logger.info("="*50)
         logger.info("Pipeline completed successfully!")
@@ -57,7 +69,7 @@ def simulate_data_pipeline():
         return True
         
     except Exception as e:
-        logger.error(f"Pipeline failed with error: {str(e)}")
+        logger.error("Pipeline failed with error: %s", e)
         logger.exception("Full traceback:")  # This logs the full error stack
         return False
 
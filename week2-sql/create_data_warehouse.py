@@ -7,10 +7,147 @@ Date: 2025-10-30
 """
 
 import sqlite3
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import polars as pl
+except ImportError:  # polars is optional; only needed for load_fact_sales(engine='polars')
+    pl = None
+
+# Bound-parameter limit assumed when the connection cannot report it (Python < 3.11):
+# SQLite's compile-time default before 3.32, and the lowest a build normally ships with
+SQLITE_DEFAULT_MAX_VARIABLES = 999
+
+# Completed order lines from the source (denormalized query)
+FACT_SOURCE_QUERY = """
+    SELECT 
+        o.order_id,
+        oi.order_item_id,
+        o.order_date,
+        o.customer_id,
+        oi.product_id,
+        o.order_status,
+        -- Infer payment method from patterns (simplified)
+        CASE 
+            WHEN o.order_id % 4 = 0 THEN 'Credit Card'
+            WHEN o.order_id % 4 = 1 THEN 'Debit Card'
+            WHEN o.order_id % 4 = 2 THEN 'PayPal'
+            ELSE 'Apple Pay'
+        END AS payment_method,
+        oi.quantity,
+        oi.unit_price,
+        oi.line_total,
+        0.0 AS discount_amount,  -- Could enhance with discount logic
+        oi.line_total * 0.08 AS tax_amount  -- 8% tax
+    FROM orders o
+    JOIN order_items oi ON o.order_id = oi.order_id
+    WHERE o.order_status = 'Completed'
+"""
+
+# Surrogate keys of dim_order_status / dim_payment_method (load order, listed in key order 1-4)
+ORDER_STATUS_KEYS = {
+    'Pending': 1,
+    'Shipped': 2,
+    'Completed': 3,
+    'Cancelled': 4
+}
+PAYMENT_METHOD_KEYS = {
+    'Credit Card': 1,
+    'Debit Card': 2,
+    'PayPal': 3,
+    'Apple Pay': 4
+}
+
+# dim_customer.valid_to_day of current SCD rows: 9999-12-31 as days since 1970-01-01
+OPEN_END_DAY = 2932896
+
+# Calendar names for the pandas dim_date loader (Monday first, as in weekday())
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# dim_date rows for every day from ? to ? (inclusive), generated inside SQLite.
+# The statement starts with INSERT (CTE inside the SELECT) so cursor.rowcount is set.
+# Matches the pandas loader: ISO week numbers, day_of_week 0=Monday, fiscal year from July.
+DIM_DATE_INSERT_SQL = """
+    INSERT INTO dim_date (
+        date_key, full_date, year, quarter, month, month_name,
+        week_of_year, day_of_year, day_of_month, day_of_week, day_name,
+        is_weekend, is_holiday, fiscal_year, fiscal_quarter
+    )
+    WITH RECURSIVE dates(d) AS (
+        SELECT date(?)
+        UNION ALL
+        SELECT date(d, '+1 day') FROM dates WHERE d < date(?)
+    ),
+    parts AS (
+        SELECT 
+            d,
+            CAST(strftime('%Y', d) AS INTEGER) AS y,
+            CAST(strftime('%m', d) AS INTEGER) AS m,
+            CAST(strftime('%w', d) AS INTEGER) AS w  -- 0=Sunday
+        FROM dates
+    )
+    SELECT 
+        CAST(strftime('%Y%m%d', d) AS INTEGER),
+        d,
+        y,
+        (m - 1) / 3 + 1,
+        m,
+        CASE m
+            WHEN 1 THEN 'January' WHEN 2 THEN 'February' WHEN 3 THEN 'March'
+            WHEN 4 THEN 'April' WHEN 5 THEN 'May' WHEN 6 THEN 'June'
+            WHEN 7 THEN 'July' WHEN 8 THEN 'August' WHEN 9 THEN 'September'
+            WHEN 10 THEN 'October' WHEN 11 THEN 'November' ELSE 'December'
+        END,
+        -- ISO week: day-of-year of this week's Thursday, in weeks
+        (CAST(strftime('%j', date(d, '-3 days', 'weekday 4')) AS INTEGER) - 1) / 7 + 1,
+        CAST(strftime('%j', d) AS INTEGER),
+        CAST(strftime('%d', d) AS INTEGER),
+        (w + 6) % 7,
+        CASE w
+            WHEN 0 THEN 'Sunday' WHEN 1 THEN 'Monday' WHEN 2 THEN 'Tuesday'
+            WHEN 3 THEN 'Wednesday' WHEN 4 THEN 'Thursday' WHEN 5 THEN 'Friday'
+            ELSE 'Saturday'
+        END,
+        w IN (0, 6),
+        0,
+        CASE WHEN m >= 7 THEN y ELSE y - 1 END,
+        (m + 5) % 12 / 3 + 1
+    FROM parts
+"""
+
+# fact_sales columns written by the loaders (net_revenue is a generated column)
+FACT_COLUMNS = [
+    'date_key', 'customer_key', 'product_key', 'status_key', 'payment_method_key',
+    'order_id', 'order_item_id',
+    'quantity', 'unit_price', 'line_total',
+    'discount_amount', 'tax_amount'
+]
+
+# Prepared INSERT shared by the pandas and Polars fact loaders
+FACT_INSERT_SQL = (
+    f"INSERT INTO fact_sales ({', '.join(FACT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(FACT_COLUMNS))})"
+)
+
+# Source rows per chunk when the pandas loader streams fact_sales
+FACT_CHUNK_SIZE = 100_000
+
+# Narrow dtypes for the integer fact columns (money columns stay float64 so REAL values are unchanged)
+FACT_INT_DTYPES = {
+    'date_key': 'int32',
+    'customer_key': 'int32',
+    'product_key': 'int32',
+    'status_key': 'int8',
+    'payment_method_key': 'int8',
+    'order_id': 'int32',
+    'order_item_id': 'int32',
+    'quantity': 'int16'
+}
+
 class DataWarehouseETL:
     """
     ETL process to build star schema data warehouse
@@ -21,6 +158,8 @@ class DataWarehouseETL:
 
         self.source_conn = None
         self.target_conn = None
+        self._customer_key_map = None  # customer_id -> current customer_key, read once per run
+        self._product_key_map = None  # product_id -> product_key, read once per run
 
         if not Path(source_db).exists():
             print(f"❌ Source database not found: {source_db}")
@@ -28,7 +167,17 @@ class DataWarehouseETL:
             raise FileNotFoundError(f"Source database not found: {source_db}")
 
         self.source_conn = sqlite3.connect(source_db)
-        self.target_conn = sqlite3.connect(target_db)
+        # Autocommit mode: the ETL brackets its own transaction with BEGIN / COMMIT
+        self.target_conn = sqlite3.connect(target_db, isolation_level=None)
+        self._cur = self.target_conn.cursor()  # Shared cursor for all warehouse statements
+
+        # Attach the source so warehouse loads can read it with INSERT ... SELECT
+        self._cur.execute("ATTACH DATABASE ? AS src", (str(source_db),))
+
+        # Bulk-load settings: the warehouse is rebuilt from the source, so trade durability for speed
+        for pragma in ("synchronous=OFF", "journal_mode=MEMORY", "temp_store=MEMORY",
+                       "cache_size=-200000", "main.locking_mode=EXCLUSIVE"):
+            self._cur.execute(f"PRAGMA {pragma}")
 
         print(f"✓ Connected to source: {source_db}")
         print(f"✓ Connected to target: {target_db}\n")
@@ -45,64 +194,97 @@ class DataWarehouseETL:
         
         # Execute all statements
         self.target_conn.executescript(sql_script)
-        self.target_conn.commit()
         
         print("✓ Dimension tables created")
         print("✓ Fact table created")
         print("✓ Indexes created")
         print("✓ Views created\n")
     
-    def load_dim_date(self, start_date='2023-01-01', end_date='2025-12-31'):
+    def _table_has_rows(self, table_name):
+        """Return True if the table has at least one row (stops at the first row, unlike COUNT(*))"""
+        return self._cur.execute(f"SELECT EXISTS (SELECT 1 FROM {table_name})").fetchone()[0] == 1
+    
+    def _max_variables(self):
+        """Bound-parameter limit of the warehouse connection (compile-time, may be below the default)"""
+        if hasattr(self.target_conn, 'getlimit'):
+            return self.target_conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+        return SQLITE_DEFAULT_MAX_VARIABLES
+    
+    def _to_sql(self, df, table_name, if_exists='append'):
+        """
+        Write a DataFrame to the warehouse with multi-row INSERTs
+        Each statement carries as many rows as SQLite's bound-parameter limit allows
+        """
+        chunksize = max(1, self._max_variables() // max(1, len(df.columns)))
+        df.to_sql(table_name, self.target_conn, if_exists=if_exists, index=False,
+                  method='multi', chunksize=chunksize)
+    
+    def load_dim_date(self, start_date='2023-01-01', end_date='2025-12-31', engine='sql'):
         """
         Load date dimension with all dates in range
         This is a type 0 dimension (never changes)
+        
+        Args:
+            start_date: First date (YYYY-MM-DD)
+            end_date: Last date (YYYY-MM-DD)
+            engine: 'sql' generates the rows inside SQLite with a recursive CTE;
+                'pandas' builds them from pd.date_range and inserts the DataFrame
         """
+        if engine not in ('sql', 'pandas'):
+            raise ValueError(f"Unknown engine: {engine!r} (expected 'sql' or 'pandas')")
+        
         print("Loading dim_date...")
         
         # Check if already loaded
-        cursor = self.target_conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM dim_date")
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
-            print(f"  ⚠ dim_date already has {count} rows, skipping...")
+        if self._table_has_rows('dim_date'):
+            print("  ⚠ dim_date already loaded, skipping...")
             return
         
-        # Generate date range
-        start = datetime.strptime(start_date, '%Y-%m-%d')
-        end = datetime.strptime(end_date, '%Y-%m-%d')
-        
-        dates = []
-        current = start
+        if engine == 'sql':
+            self._cur.execute(DIM_DATE_INSERT_SQL, (start_date, end_date))
+            rows_loaded = self._cur.rowcount
+            table_rows = self._cur.execute("SELECT COUNT(*) FROM dim_date").fetchone()[0]
+            if rows_loaded != table_rows:
+                raise RuntimeError(f"dim_date load reported {rows_loaded} rows but the table has {table_rows}")
+            print(f"  ✓ Loaded {rows_loaded} dates from {start_date} to {end_date}\n")
+            return
         
-        while current <= end:
-            date_key = int(current.strftime('%Y%m%d'))
-            
-            dates.append({
-                'date_key': date_key,
-                'full_date': current.strftime('%Y-%m-%d'),
-                'year': current.year,
-                'quarter': (current.month - 1) // 3 + 1,
-                'month': current.month,
-                'month_name': current.strftime('%B'),
-                'week_of_year': current.isocalendar()[1],
-                'day_of_year': current.timetuple().tm_yday,
-                'day_of_month': current.day,
-                'day_of_week': current.weekday(),  # 0=Monday in Python
-                'day_name': current.strftime('%A'),
-                'is_weekend': 1 if current.weekday() >= 5 else 0,
-                'is_holiday': 0,  # Could enhance with holiday logic
-                'fiscal_year': current.year if current.month >= 7 else current.year - 1,
-                'fiscal_quarter': ((current.month - 7) % 12) // 3 + 1
-            })
-            
-            current += timedelta(days=1)
+        # Generate the date range as datetime64[D] and derive every attribute with integer arithmetic
+        days = np.arange(np.datetime64(start_date), np.datetime64(end_date) + 1, dtype='datetime64[D]')
+        month_starts = days.astype('datetime64[M]')
+        year_starts = days.astype('datetime64[Y]')
+        
+        years = year_starts.astype(np.int64) + 1970
+        months = month_starts.astype(np.int64) % 12 + 1
+        day_of_month = (days - month_starts).astype(np.int64) + 1
+        day_of_week = (days.astype(np.int64) + 3) % 7  # 0=Monday (1970-01-01 was a Thursday)
+        
+        # ISO week: counted from the first Thursday of the year that holds this week's Thursday
+        thursdays = days - day_of_week + 3
+        week_of_year = (thursdays - thursdays.astype('datetime64[Y]')).astype(np.int64) // 7 + 1
+        
+        df = pd.DataFrame({
+            'date_key': years * 10000 + months * 100 + day_of_month,
+            'full_date': np.datetime_as_string(days, unit='D'),
+            'year': years,
+            'quarter': (months - 1) // 3 + 1,
+            'month': months,
+            'month_name': np.array(MONTH_NAMES)[months - 1],
+            'week_of_year': week_of_year,
+            'day_of_year': (days - year_starts).astype(np.int64) + 1,
+            'day_of_month': day_of_month,
+            'day_of_week': day_of_week,  # as in Python's weekday()
+            'day_name': np.array(DAY_NAMES)[day_of_week],
+            'is_weekend': (day_of_week >= 5).astype(int),
+            'is_holiday': 0,  # Could enhance with holiday logic
+            'fiscal_year': np.where(months >= 7, years, years - 1),
+            'fiscal_quarter': ((months - 7) % 12) // 3 + 1
+        })
         
         # Bulk insert
-        df = pd.DataFrame(dates)
-        df.to_sql('dim_date', self.target_conn, if_exists='append', index=False)
+        self._to_sql(df, 'dim_date', if_exists='append')
         
-        print(f"  ✓ Loaded {len(dates)} dates from {start_date} to {end_date}\n")
+        print(f"  ✓ Loaded {len(df)} dates from {start_date} to {end_date}\n")
     
     def load_dim_customer(self):
         """
@@ -112,16 +294,18 @@ class DataWarehouseETL:
         print("Loading dim_customer...")
         
         # Check if already loaded
-        cursor = self.target_conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM dim_customer")
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
-            print(f"  ⚠ dim_customer already has {count} rows, skipping...")
+        if self._table_has_rows('dim_customer'):
+            print("  ⚠ dim_customer already loaded, skipping...")
             return
         
-        # Extract from source
+        # Copy straight from the attached source, adding the SCD Type 2 columns
+        # (created_at / updated_at come from the schema's CURRENT_TIMESTAMP defaults)
         query = """
+            INSERT INTO dim_customer (
+                customer_id, first_name, last_name, email, phone, city, state,
+                customer_tier, registration_date,
+                valid_from_day, valid_to_day, is_current
+            )
             SELECT 
                 customer_id,
                 first_name,
@@ -131,39 +315,34 @@ class DataWarehouseETL:
                 city,
                 state,
                 customer_tier,
-                registration_date
-            FROM customers
+                registration_date,
+                CAST(julianday(registration_date) - 2440587.5 AS INTEGER) AS valid_from_day,
+                ? AS valid_to_day,
+                1 AS is_current
+            FROM src.customers
         """
         
-        df = pd.read_sql_query(query, self.source_conn)
-        
-        # Add SCD Type 2 columns
-        df['valid_from'] = df['registration_date']
-        df['valid_to'] = '9999-12-31'
-        df['is_current'] = 1
-        df['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        df['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Load to warehouse
-        df.to_sql('dim_customer', self.target_conn, if_exists='append', index=False)
+        self._cur.execute(query, (OPEN_END_DAY,))
+        self._customer_key_map = None  # Re-read after the load
         
-        print(f"  ✓ Loaded {len(df)} customers\n")
+        print(f"  ✓ Loaded {self._cur.rowcount} customers\n")
     
     def load_dim_product(self):
         """Load product dimension (denormalized with category)"""
         print("Loading dim_product...")
         
         # Check if already loaded
-        cursor = self.target_conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM dim_product")
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
-            print(f"  ⚠ dim_product already has {count} rows, skipping...")
+        if self._table_has_rows('dim_product'):
+            print("  ⚠ dim_product already loaded, skipping...")
             return
         
-        # Extract from source (join products and categories)
+        # Copy straight from the attached source (join products and categories)
+        # (created_at / updated_at come from the schema's CURRENT_TIMESTAMP defaults)
         query = """
+            INSERT INTO dim_product (
+                product_id, product_name, category_id, category_name,
+                category_description, unit_price, is_active
+            )
             SELECT 
                 p.product_id,
                 p.product_name,
@@ -172,164 +351,255 @@ class DataWarehouseETL:
                 c.description AS category_description,
                 p.unit_price,
                 p.is_active
-            FROM products p
-            JOIN categories c ON p.category_id = c.category_id
+            FROM src.products p
+            JOIN src.categories c ON p.category_id = c.category_id
         """
         
-        df = pd.read_sql_query(query, self.source_conn)
-        
-        # Add metadata
-        df['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        df['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._cur.execute(query)
+        self._product_key_map = None  # Re-read after the load
         
-        # Load to warehouse
-        df.to_sql('dim_product', self.target_conn, if_exists='append', index=False)
-        
-        print(f"  ✓ Loaded {len(df)} products\n")
+        print(f"  ✓ Loaded {self._cur.rowcount} products\n")
     
     def load_dim_order_status(self):
-        """Load order status dimension"""
+        """
+        Load order status dimension
+        Rows are replaced in place (keeping the data_modeling.sql schema) with
+        explicit keys matching ORDER_STATUS_KEYS
+        """
         print("Loading dim_order_status...")
         
+        # (status_code, status_name, status_description, is_final_state)
         statuses = [
-            {'status_code': 'PENDING', 'status_name': 'Pending', 
-             'status_description': 'Order placed, awaiting processing', 'is_final_state': 0},
-            {'status_code': 'SHIPPED', 'status_name': 'Shipped', 
-             'status_description': 'Order shipped to customer', 'is_final_state': 0},
-            {'status_code': 'COMPLETED', 'status_name': 'Completed', 
-             'status_description': 'Order delivered and completed', 'is_final_state': 1},
-            {'status_code': 'CANCELLED', 'status_name': 'Cancelled', 
-             'status_description': 'Order cancelled', 'is_final_state': 1},
+            ('PENDING', 'Pending', 'Order placed, awaiting processing', 0),
+            ('SHIPPED', 'Shipped', 'Order shipped to customer', 0),
+            ('COMPLETED', 'Completed', 'Order delivered and completed', 1),
+            ('CANCELLED', 'Cancelled', 'Order cancelled', 1),
         ]
         
-        df = pd.DataFrame(statuses)
-        df.to_sql('dim_order_status', self.target_conn, if_exists='replace', index=False)
+        self._cur.execute("DELETE FROM dim_order_status")
+        self._cur.executemany(
+            """INSERT INTO dim_order_status
+                   (status_key, status_code, status_name, status_description, is_final_state)
+               VALUES (?, ?, ?, ?, ?)""",
+            [(ORDER_STATUS_KEYS[status[1]],) + status for status in statuses]
+        )
         
-        print(f"  ✓ Loaded {len(df)} order statuses\n")
+        print(f"  ✓ Loaded {len(statuses)} order statuses\n")
     
     def load_dim_payment_method(self):
-        """Load payment method dimension"""
+        """
+        Load payment method dimension
+        Rows are replaced in place (keeping the data_modeling.sql schema) with
+        explicit keys matching PAYMENT_METHOD_KEYS
+        """
         print("Loading dim_payment_method...")
         
+        # (payment_method_code, payment_method_name, processing_fee_pct)
         methods = [
-            {'payment_method_code': 'CC', 'payment_method_name': 'Credit Card', 'processing_fee_pct': 2.9},
-            {'payment_method_code': 'DC', 'payment_method_name': 'Debit Card', 'processing_fee_pct': 1.5},
-            {'payment_method_code': 'PP', 'payment_method_name': 'PayPal', 'processing_fee_pct': 3.5},
-            {'payment_method_code': 'AP', 'payment_method_name': 'Apple Pay', 'processing_fee_pct': 2.5},
+            ('CC', 'Credit Card', 2.9),
+            ('DC', 'Debit Card', 1.5),
+            ('PP', 'PayPal', 3.5),
+            ('AP', 'Apple Pay', 2.5),
         ]
         
-        df = pd.DataFrame(methods)
-        df.to_sql('dim_payment_method', self.target_conn, if_exists='replace', index=False)
+        self._cur.execute("DELETE FROM dim_payment_method")
+        self._cur.executemany(
+            """INSERT INTO dim_payment_method
+                   (payment_method_key, payment_method_code, payment_method_name, processing_fee_pct)
+               VALUES (?, ?, ?, ?)""",
+            [(PAYMENT_METHOD_KEYS[method[1]],) + method for method in methods]
+        )
         
-        print(f"  ✓ Loaded {len(df)} payment methods\n")
+        print(f"  ✓ Loaded {len(methods)} payment methods\n")
     
-    def load_fact_sales(self):
+    def load_fact_sales(self, engine='sql'):
         """
         Load fact table from source
         This is the main ETL transformation
+        
+        Args:
+            engine: 'sql' resolves surrogate keys inside SQLite with one INSERT ... SELECT
+                over the attached source; 'pandas' or 'polars' extract and join in that library
         """
+        if engine not in ('sql', 'pandas', 'polars'):
+            raise ValueError(f"Unknown engine: {engine!r} (expected 'sql', 'pandas' or 'polars')")
+        if engine == 'polars' and pl is None:
+            raise ImportError("engine='polars' requires the polars package")
+        
         print("Loading fact_sales...")
         
         # Check if already loaded
-        cursor = self.target_conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM fact_sales")
-        count = cursor.fetchone()[0]
-        
-        if count > 0:
-            print(f"  ⚠ fact_sales already has {count} rows, skipping...")
+        if self._table_has_rows('fact_sales'):
+            print("  ⚠ fact_sales already loaded, skipping...")
             return
         
-        # Extract from source (denormalized query)
+        if engine == 'sql':
+            self._load_fact_sales_sql()
+        elif engine == 'polars':
+            self._load_fact_sales_polars()
+        else:
+            self._load_fact_sales_pandas()
+    
+    def _load_fact_sales_sql(self):
+        """
+        Load fact_sales with a single INSERT ... SELECT joining the source tables
+        to the dimension tables (no rows pass through Python)
+        """
         query = """
+            INSERT INTO fact_sales (
+                date_key, customer_key, product_key, status_key, payment_method_key,
+                order_id, order_item_id,
+                quantity, unit_price, line_total,
+                discount_amount, tax_amount
+            )
             SELECT 
+                CAST(REPLACE(o.order_date, '-', '') AS INTEGER) AS date_key,
+                dc.customer_key,
+                dp.product_key,
+                -- Same keys as the dim_order_status / dim_payment_method load order
+                CASE o.order_status
+                    WHEN 'Pending' THEN 1
+                    WHEN 'Shipped' THEN 2
+                    WHEN 'Completed' THEN 3
+                    WHEN 'Cancelled' THEN 4
+                END AS status_key,
+                CASE 
+                    WHEN o.order_id % 4 = 0 THEN 1  -- Credit Card
+                    WHEN o.order_id % 4 = 1 THEN 2  -- Debit Card
+                    WHEN o.order_id % 4 = 2 THEN 3  -- PayPal
+                    ELSE 4                          -- Apple Pay
+                END AS payment_method_key,
                 o.order_id,
                 oi.order_item_id,
-                o.order_date,
-                o.customer_id,
-                oi.product_id,
-                o.order_status,
-                -- Infer payment method from patterns (simplified)
-                CASE 
-                    WHEN o.order_id % 4 = 0 THEN 'Credit Card'
-                    WHEN o.order_id % 4 = 1 THEN 'Debit Card'
-                    WHEN o.order_id % 4 = 2 THEN 'PayPal'
-                    ELSE 'Apple Pay'
-                END AS payment_method,
                 oi.quantity,
                 oi.unit_price,
                 oi.line_total,
-                0.0 AS discount_amount,  -- Could enhance with discount logic
+                0.0 AS discount_amount,
                 oi.line_total * 0.08 AS tax_amount  -- 8% tax
-            FROM orders o
-            JOIN order_items oi ON o.order_id = oi.order_id
+            FROM src.orders o
+            JOIN src.order_items oi ON o.order_id = oi.order_id
+            LEFT JOIN dim_customer dc ON dc.customer_id = o.customer_id AND dc.is_current = 1
+            LEFT JOIN dim_product dp ON dp.product_id = oi.product_id
             WHERE o.order_status = 'Completed'
         """
         
-        df_source = pd.read_sql_query(query, self.source_conn)
+        # Committed by run_full_etl
+        self._cur.execute(query)
         
-        print(f"  Extracted {len(df_source)} records from source")
+        print(f"  ✓ Loaded {self._cur.rowcount} sales transactions\n")
+    
+    def _load_fact_sales_pandas(self):
+        """
+        Load fact_sales by extracting from the source and resolving keys in pandas
+        The source is streamed in chunks of FACT_CHUNK_SIZE rows, so memory stays
+        bounded by one chunk rather than the whole fact table
+        """
+        rows_loaded = 0
+        
+        # Extract from source (denormalized query), transform and load chunk by chunk
+        for df_source in pd.read_sql_query(FACT_SOURCE_QUERY, self.source_conn, chunksize=FACT_CHUNK_SIZE):
+            df_fact = self._transform_fact_chunk(df_source)
+            self._insert_fact_rows(df_fact.itertuples(index=False, name=None))
+            rows_loaded += len(df_fact)
+        
+        print(f"  Extracted {rows_loaded} records from source")
+        print(f"  ✓ Loaded {rows_loaded} sales transactions\n")
+    
+    def _transform_fact_chunk(self, df_source):
+        """
+        Resolve surrogate keys and measures for a chunk of source rows
+        
+        Args:
+            df_source: DataFrame of FACT_SOURCE_QUERY rows
         
+        Returns:
+            DataFrame with FACT_COLUMNS
+        """
         # Transform: Get surrogate keys from dimensions
         
         # 1. Get date keys
-        df_source['date_key'] = df_source['order_date'].apply(
-            lambda x: int(x.replace('-', ''))
+        order_dates = pd.to_datetime(df_source['order_date'], format='%Y-%m-%d')
+        df_source['date_key'] = (
+            order_dates.dt.year * 10000 + order_dates.dt.month * 100 + order_dates.dt.day
         )
         
-        # 2. Get customer keys (join with dim_customer)
-        dim_customer = pd.read_sql_query(
-            "SELECT customer_key, customer_id FROM dim_customer WHERE is_current = 1",
-            self.target_conn
-        )
-        df_source = df_source.merge(dim_customer, on='customer_id', how='left')
+        # 2. Get customer keys (lookup in the cached dim_customer map)
+        df_source['customer_key'] = df_source['customer_id'].map(self._get_customer_key_map())
         
         # 3. Get product keys
-        dim_product = pd.read_sql_query(
-            "SELECT product_key, product_id FROM dim_product",
-            self.target_conn
-        )
-        df_source = df_source.merge(dim_product, on='product_id', how='left')
-        
-        # 4. Get status keys
-        status_mapping = {
-            'Completed': 3,  # Based on our dim_order_status
-            'Pending': 1,
-            'Shipped': 2,
-            'Cancelled': 4
-        }
-        df_source['status_key'] = df_source['order_status'].map(status_mapping)
-        
-        # 5. Get payment method keys
-        payment_mapping = {
-            'Credit Card': 1,
-            'Debit Card': 2,
-            'PayPal': 3,
-            'Apple Pay': 4
-        }
-        df_source['payment_method_key'] = df_source['payment_method'].map(payment_mapping)
-        
-        # Calculate net revenue
-        df_source['net_revenue'] = (
-            df_source['line_total'] - 
-            df_source['discount_amount'] + 
-            df_source['tax_amount']
-        )
+        df_source['product_key'] = df_source['product_id'].map(self._get_product_key_map())
         
-        # Select columns for fact table
-        fact_columns = [
-            'date_key', 'customer_key', 'product_key', 'status_key', 'payment_method_key',
-            'order_id', 'order_item_id',
-            'quantity', 'unit_price', 'line_total', 
-            'discount_amount', 'tax_amount', 'net_revenue'
-        ]
+        # 4. Get status keys: with the categories in key order, code + 1 is the key (int8)
+        df_source['status_key'] = self._categorical_keys(df_source['order_status'], ORDER_STATUS_KEYS)
+        
+        # 5. Get payment method keys (same categorical-code lookup)
+        df_source['payment_method_key'] = self._categorical_keys(df_source['payment_method'], PAYMENT_METHOD_KEYS)
+        
+        # Select columns for fact table, with keys and counts narrowed to the smallest int types
+        return df_source[FACT_COLUMNS].astype(FACT_INT_DTYPES)
+    
+    @staticmethod
+    def _categorical_keys(values, key_map):
+        """
+        Map values to surrogate keys via categorical codes (categories in key order)
+        Unknown values get code -1; raise instead of writing a dangling key 0
+        """
+        codes = pd.Categorical(values, categories=list(key_map)).codes
+        if (codes < 0).any():
+            unknown = sorted(set(values[codes < 0].astype(str)))
+            raise ValueError(f"No dimension key for {values.name} value(s): {unknown}")
+        return codes + 1
+    
+    def _load_fact_sales_polars(self):
+        """
+        Load fact_sales by extracting into Polars and resolving keys with
+        multi-threaded expressions on Arrow buffers
+        """
+        df_source = pl.read_database(FACT_SOURCE_QUERY, self.source_conn)
         
-        df_fact = df_source[fact_columns].copy()
+        print(f"  Extracted {len(df_source)} records from source")
+        
+        df_fact = (
+            df_source
+            .with_columns(
+                customer_key=pl.col('customer_id').replace_strict(self._get_customer_key_map(), default=None),
+                product_key=pl.col('product_id').replace_strict(self._get_product_key_map(), default=None),
+                date_key=pl.col('order_date').str.replace_all('-', '').cast(pl.Int64),
+                status_key=pl.col('order_status').replace_strict(ORDER_STATUS_KEYS, default=None),
+                payment_method_key=pl.col('payment_method').replace_strict(PAYMENT_METHOD_KEYS, default=None)
+            )
+            .select(FACT_COLUMNS)
+        )
         
         # Load to warehouse
-        df_fact.to_sql('fact_sales', self.target_conn, if_exists='append', index=False)
+        self._insert_fact_rows(df_fact.iter_rows())
         
         print(f"  ✓ Loaded {len(df_fact)} sales transactions\n")
     
+    def _get_customer_key_map(self):
+        """Return the cached customer_id -> customer_key map of current dim_customer rows"""
+        if self._customer_key_map is None:
+            self._customer_key_map = dict(self._cur.execute(
+                "SELECT customer_id, customer_key FROM dim_customer WHERE is_current = 1"
+            ))
+        return self._customer_key_map
+    
+    def _get_product_key_map(self):
+        """Return the cached product_id -> product_key map of dim_product"""
+        if self._product_key_map is None:
+            self._product_key_map = dict(self._cur.execute(
+                "SELECT product_id, product_key FROM dim_product"
+            ))
+        return self._product_key_map
+    
+    def _insert_fact_rows(self, rows):
+        """
+        Insert fact rows (tuples in FACT_COLUMNS order) with one prepared INSERT
+        The SQL text is the same constant for every chunk, so SQLite reuses the
+        prepared statement; the rows are committed by run_full_etl
+        """
+        self._cur.executemany(FACT_INSERT_SQL, rows)
+    
     def run_full_etl(self):
         """Execute complete ETL process"""
         print("\n" + "🏗️"*40)
@@ -340,6 +610,10 @@ class DataWarehouseETL:
             # Step 1: Create schema
             self.create_warehouse_schema()
             
+            # Steps 2-3 run inside one write transaction
+            # (note: pandas' to_sql, used by load_dim_date(engine='pandas'), commits it early)
+            self._cur.execute("BEGIN IMMEDIATE")
+            
             # Step 2: Load dimensions (order matters!)
             self.load_dim_date()
             self.load_dim_customer()
@@ -349,15 +623,23 @@ class DataWarehouseETL:
             
             # Step 3: Load facts (must come after dimensions)
             self.load_fact_sales()
+            if self.target_conn.in_transaction:
+                self._cur.execute("COMMIT")
             
             # Step 4: Verify
             self.verify_warehouse()
             
+            # Step 5: Gather planner statistics for the star-schema joins
+            self._cur.execute("ANALYZE")
+            self._cur.execute("PRAGMA optimize")
+            
             print("\n" + "="*80)
             print("✅ DATA WAREHOUSE ETL COMPLETED SUCCESSFULLY!")
             print("="*80)
             
         except Exception as e:
+            if self.target_conn.in_transaction:
+                self._cur.execute("ROLLBACK")
             print(f"\n❌ ETL Failed: {e}")
             import traceback
             traceback.print_exc()
@@ -377,10 +659,9 @@ class DataWarehouseETL:
             'fact_sales'
         ]
         
-        for table in tables:
-            cursor = self.target_conn.cursor()
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            count = cursor.fetchone()[0]
+        # All row counts in one round trip
+        query = " UNION ALL ".join(f"SELECT '{table}', COUNT(*) FROM {table}" for table in tables)
+        for table, count in self._cur.execute(query).fetchall():
             print(f"  {table:25} {count:>10,} rows")
         
         print()
@@ -33,8 +33,8 @@ CREATE TABLE IF NOT EXISTS dim_date (
     fiscal_quarter INTEGER
 );
 
-CREATE INDEX idx_dim_date_full_date ON dim_date(full_date);
-CREATE INDEX idx_dim_date_year_month ON dim_date(year, month);
+CREATE INDEX IF NOT EXISTS idx_dim_date_full_date ON dim_date(full_date);
+CREATE INDEX IF NOT EXISTS idx_dim_date_year_month ON dim_date(year, month);
 
 -- Dimension 2: Customer Dimension (Type 2 SCD - keeps history)
 CREATE TABLE IF NOT EXISTS dim_customer (
@@ -49,16 +49,22 @@ CREATE TABLE IF NOT EXISTS dim_customer (
     customer_tier TEXT NOT NULL,
     registration_date DATE,
       -- SCD Type 2 columns
-    valid_from DATE NOT NULL,
-    valid_to DATE NOT NULL DEFAULT '9999-12-31',
+    -- Validity range stored as days since 1970-01-01 (2932896 = 9999-12-31),
+    -- so rows stay small and point-in-time lookups compare integers
+    valid_from_day INTEGER NOT NULL,
+    valid_to_day INTEGER NOT NULL DEFAULT 2932896,
     is_current BOOLEAN NOT NULL DEFAULT 1,
+    -- ISO dates for display, generated from the day numbers (not stored)
+    valid_from DATE GENERATED ALWAYS AS (date(valid_from_day + 2440587.5)) VIRTUAL,
+    valid_to DATE GENERATED ALWAYS AS (date(valid_to_day + 2440587.5)) VIRTUAL,
     -- Metadata
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_dim_customer_natural_key ON dim_customer(customer_id, is_current);
-CREATE INDEX idx_dim_customer_tier ON dim_customer(customer_tier);
+CREATE INDEX IF NOT EXISTS idx_dim_customer_scd ON dim_customer(customer_id, is_current, valid_from_day, valid_to_day);
+CREATE INDEX IF NOT EXISTS idx_dim_customer_current ON dim_customer(customer_id) WHERE is_current = 1;
+CREATE INDEX IF NOT EXISTS idx_dim_customer_tier ON dim_customer(customer_tier);
 
 -- Dimension 3: Product Dimension
 CREATE TABLE IF NOT EXISTS dim_product (
@@ -76,8 +82,8 @@ CREATE TABLE IF NOT EXISTS dim_product (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
-CREATE INDEX idx_dim_product_category ON dim_product(category_name);
-CREATE INDEX idx_dim_product_active ON dim_product(is_active);
+CREATE INDEX IF NOT EXISTS idx_dim_product_category ON dim_product(category_name);
+CREATE INDEX IF NOT EXISTS idx_dim_product_active ON dim_product(is_active);
 
 -- Dimension 4: Order Status Dimension (small lookup table)
 CREATE TABLE IF NOT EXISTS dim_order_status (
@@ -118,7 +124,7 @@ CREATE TABLE IF NOT EXISTS fact_sales (
     line_total REAL NOT NULL,
     discount_amount REAL DEFAULT 0.0,
     tax_amount REAL DEFAULT 0.0,
-    net_revenue REAL NOT NULL,                    -- line_total - discount + tax
+    net_revenue REAL NOT NULL GENERATED ALWAYS AS (line_total - discount_amount + tax_amount) STORED,
     -- Derived measures (can be calculated, but stored for performance)
     gross_profit REAL,                            -- If you have cost data
     -- Metadata
@@ -133,11 +139,11 @@ CREATE TABLE IF NOT EXISTS fact_sales (
 );
 
 -- Critical indexes for fact table (will be queried heavily)
-CREATE INDEX idx_fact_sales_date ON fact_sales(date_key);
-CREATE INDEX idx_fact_sales_customer ON fact_sales(customer_key);
-CREATE INDEX idx_fact_sales_product ON fact_sales(product_key);
-CREATE INDEX idx_fact_sales_order ON fact_sales(order_id);
-CREATE INDEX idx_fact_sales_composite ON fact_sales(date_key, customer_key, product_key);
+CREATE INDEX IF NOT EXISTS idx_fact_sales_date ON fact_sales(date_key);
+CREATE INDEX IF NOT EXISTS idx_fact_sales_customer ON fact_sales(customer_key);
+CREATE INDEX IF NOT EXISTS idx_fact_sales_product ON fact_sales(product_key);
+CREATE INDEX IF NOT EXISTS idx_fact_sales_order ON fact_sales(order_id);
+CREATE INDEX IF NOT EXISTS idx_fact_sales_composite ON fact_sales(date_key, customer_key, product_key);
 
 -- ============================================================================
 -- VIEWS FOR EASIER QUERYING
@@ -6,37 +6,157 @@ Author: Jason Amar
 Date: 2025-10-27
 """
 
+import collections
+import hashlib
+import os
+import re
 import sqlite3
+import statistics
 import time
+import numpy as np
 import pandas as pd
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Tuple, Dict, List
 
+# Queries benchmarked by run_performance_tests, as (name, query) pairs
+TEST_QUERIES = (
+    ("Customer Email Lookup", """
+        SELECT * FROM customers 
+        WHERE email = 'emily.johnson100@email.com'
+    """),
+    
+    ("Customer Orders Join", """
+        SELECT 
+            c.customer_id,
+            c.first_name,
+            c.last_name,
+            COUNT(o.order_id) AS order_count,
+            ROUND(SUM(o.total_amount), 2) AS total_spent
+        FROM customers c
+        JOIN orders o ON c.customer_id = o.customer_id
+        WHERE o.order_status = 'Completed'
+        GROUP BY c.customer_id, c.first_name, c.last_name
+        HAVING COUNT(o.order_id) >= 3
+        ORDER BY total_spent DESC
+        LIMIT 20
+    """),
+    
+    ("Date Range Query", """
+        SELECT 
+            substr(order_date, 1, 7) AS month,
+            COUNT(*) AS orders,
+            ROUND(SUM(total_amount), 2) AS revenue
+        FROM orders
+        WHERE order_date >= ?
+            AND order_status = 'Completed'
+        GROUP BY substr(order_date, 1, 7)
+        ORDER BY month
+    """),
+    
+    ("Multi-Table Join", """
+        SELECT 
+            cat.category_name,
+            p.product_name,
+            COUNT(DISTINCT o.customer_id) AS customers,
+            SUM(oi.quantity) AS units_sold,
+            ROUND(SUM(oi.line_total), 2) AS revenue
+        FROM categories cat
+        JOIN products p ON cat.category_id = p.category_id
+        JOIN order_items oi ON p.product_id = oi.product_id
+        JOIN orders o ON oi.order_id = o.order_id
+        WHERE o.order_status = 'Completed'
+        GROUP BY cat.category_name, p.product_name
+        ORDER BY revenue DESC
+        LIMIT 10
+    """),
+)
+
 class QueryOptimizer:
     """
     Tools for analyzing and optimizing SQL query performance
     """
     
-    def __init__(self, db_path='sales_analytics.db'):
-        """Initialize with database connection"""
+    def __init__(self, db_path='sales_analytics.db', trace_sql=False):
+        """
+        Initialize with database connection
+        
+        Args:
+            db_path: SQLite database to optimize
+            trace_sql: Print every statement SQLite executes (for debugging)
+        """
         if not Path(db_path).exists():
             print(f"❌ Database not found: {db_path}")
             print("Please run setup_database.py first!")
             return
         
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
+        self.trace_sql = trace_sql
+        self._connect()
+        
+        # EXPLAIN results keyed on a hash of the normalized query, its parameters
+        # and the current set of indexes, so a plan is reused until indexes change
+        self._plan_cache: Dict[str, List[Dict]] = {}
+        
         print(f"✓ Connected to {db_path}\n")
     
-    def benchmark_query(self, query: str, query_name: str, iterations: int = 5) -> Dict:
+    def _connect(self):
+        """Open the database connection and apply the benchmark pragmas"""
+        self.conn = sqlite3.connect(self.db_path)
+        self.cursor = self.conn.cursor()
+        
+        # Executions per normalized statement on this connection; the prepared-
+        # statement cache is per connection, so a reconnect starts a fresh count
+        self._stmt_stats = collections.Counter()
+        
+        # Keep the working set in memory so iterations don't pay page reloads;
+        # page_size is left alone as it can't change on an existing WAL database
+        self.cursor.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA cache_size=-262144;
+            PRAGMA mmap_size=1073741824;
+            PRAGMA temp_store=MEMORY;
+        """)
+        
+        if self.trace_sql:
+            self.conn.set_trace_callback(lambda statement: print(f"  [sql] {statement}"))
+    
+    def _drop_caches(self):
+        """
+        Start the next measurement from a cold cache
+        
+        Reconnecting discards SQLite's per-connection page cache. The OS page
+        cache is only dropped when running as root on Linux.
+        """
+        self.conn.close()
+        self._connect()
+        
+        if hasattr(os, 'geteuid') and os.geteuid() == 0:
+            try:
+                os.sync()
+                with open('/proc/sys/vm/drop_caches', 'w') as f:
+                    f.write('1')
+                print("✓ Dropped SQLite and OS page caches")
+                return
+            except OSError:
+                pass
+        print("✓ Dropped SQLite page cache")
+    
+    def benchmark_query(self, query: str, query_name: str, iterations: int = 5,
+                        warmup_iterations: int = 2, params: Tuple = ()) -> Dict:
         """
         Benchmark a query's execution time
         
+        The first warm-up run is timed separately as the cold (page cache fill)
+        cost; warm-up runs are not included in the averages.
+        
         Args:
             query: SQL query to benchmark
             query_name: Descriptive name
             iterations: Number of times to run query
+            warmup_iterations: Untimed runs before measuring
+            params: Values bound to the query's ? placeholders
         
         Returns:
             Dictionary with timing statistics
@@ -45,56 +165,175 @@ class QueryOptimizer:
         print(f"BENCHMARKING: {query_name}")
         print(f"{'='*80}")
         
-        times = []
+        self._stmt_stats[self._normalize_query(query)] += warmup_iterations + iterations
         
-        for i in range(iterations):
-            start = time.time()
-            self.cursor.execute(query)
-            results = self.cursor.fetchall()
-            elapsed = time.time() - start
-            times.append(elapsed)
-            print(f"  Run {i+1}: {elapsed:.4f}s ({len(results)} rows)")
+        cold_time = None
+        for i in range(warmup_iterations):
+            start = time.perf_counter_ns()
+            self.cursor.execute(query, params)
+            for _ in self.cursor:
+                pass
+            if i == 0:
+                cold_time = (time.perf_counter_ns() - start) / 1e9
+                print(f"  Cold run: {cold_time:.6f}s")
         
-        avg_time = sum(times) / len(times)
-        min_time = min(times)
-        max_time = max(times)
+        # Samples stay as integer nanoseconds; convert to seconds only for display
+        times_ns = []
         
-        print(f"\n  Average: {avg_time:.4f}s")
-        print(f"  Min: {min_time:.4f}s")
-        print(f"  Max: {max_time:.4f}s")
+        for i in range(iterations):
+            start = time.perf_counter_ns()
+            self.cursor.execute(query, params)
+            # Step through the rows without building a result list
+            row_count = 0
+            for _ in self.cursor:
+                row_count += 1
+            elapsed_ns = time.perf_counter_ns() - start
+            times_ns.append(elapsed_ns)
+            print(f"  Run {i+1}: {elapsed_ns/1e9:.6f}s ({row_count} rows)")
+        
+        avg_ns = sum(times_ns) // len(times_ns)
+        median_ns = statistics.median(times_ns)
+        stdev_ns = statistics.stdev(times_ns) if len(times_ns) > 1 else 0
+        min_ns = min(times_ns)
+        max_ns = max(times_ns)
+        
+        print(f"\n  Median: {median_ns/1e9:.6f}s")
+        print(f"  Stdev: {stdev_ns/1e9:.6f}s")
+        print(f"  Average: {avg_ns/1e9:.6f}s")
+        print(f"  Min: {min_ns/1e9:.6f}s")
+        print(f"  Max: {max_ns/1e9:.6f}s")
         
         return {
             'query_name': query_name,
-            'avg_time': avg_time,
-            'min_time': min_time,
-            'max_time': max_time,
-            'iterations': iterations
+            'avg_time': avg_ns / 1e9,
+            'warm_avg': avg_ns / 1e9,
+            'median_time': median_ns / 1e9,
+            'stdev_time': stdev_ns / 1e9,
+            'cold_time': cold_time,
+            'min_time': min_ns / 1e9,
+            'max_time': max_ns / 1e9,
+            'times_ns': times_ns,
+            'iterations': iterations,
+            'warmup_iterations': warmup_iterations
         }
     
-    def explain_query(self, query: str, query_name: str = "Query"):
+    def explain_query(self, query: str, query_name: str = "Query", params: Tuple = ()) -> List[Dict]:
         """
         Show query execution plan
         
         Args:
             query: SQL query to explain
             query_name: Descriptive name
+            params: Values bound to the query's ? placeholders
+        
+        Returns:
+            List of plan steps as {"id", "parent", "detail"} dictionaries
         """
         print(f"\n{'='*80}")
         print(f"EXECUTION PLAN: {query_name}")
         print(f"{'='*80}\n")
         
-        explain_query = f"EXPLAIN QUERY PLAN {query}"
-        
-        self.cursor.execute(explain_query)
-        plan = self.cursor.fetchall()
+        plan = self._query_plan(query, params)
         
         print("Query Execution Steps:")
         print("-" * 80)
-        for row in plan:
-            # SQLite EXPLAIN QUERY PLAN returns: (id, parent, notused, detail)
-            print(f"  {row[3]}")
+        for step in plan:
+            print(f"  {step['detail']}")
         
         print("\n" + "="*80)
+        return plan
+    
+    def estimate_rows_touched(self, query: str, params: Tuple = ()) -> int:
+        """
+        Crude estimate of the rows a query reads
+        
+        Sums the row counts of every table the plan does a full SCAN of;
+        indexed SEARCH steps are treated as free.
+        
+        Args:
+            query: SQL query to estimate
+            params: Values bound to the query's ? placeholders
+        
+        Returns:
+            Estimated number of rows touched
+        """
+        # Resolve plan aliases ("SCAN oi") back to table names
+        aliases = {}
+        for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", query, re.IGNORECASE):
+            if alias.upper() in ("", "ON", "WHERE", "JOIN", "GROUP", "ORDER", "LIMIT"):
+                alias = table
+            aliases[alias] = table
+        
+        scanned = [
+            step["detail"].split()[1]
+            for step in self._query_plan(query, params)
+            if step["detail"].startswith("SCAN ")
+        ]
+        
+        rows = 0
+        for name in scanned:
+            table = aliases.get(name, name)
+            self.cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            rows += self.cursor.fetchone()[0]
+        return rows
+    
+    def _query_plan(self, query: str, params: Tuple = ()) -> List[Dict]:
+        """
+        Return the EXPLAIN QUERY PLAN steps for a query, cached per index set
+        
+        Args:
+            query: SQL query to explain
+            params: Values bound to the query's ? placeholders
+        
+        Returns:
+            List of plan steps as {"id", "parent", "detail"} dictionaries
+        """
+        # Any index added or dropped changes the signature, so stale plans are never reused
+        self.cursor.execute(
+            "SELECT group_concat(name || ':' || ifnull(sql, ''), '|') "
+            "FROM (SELECT name, sql FROM sqlite_master WHERE type = 'index' ORDER BY name)"
+        )
+        index_set = self.cursor.fetchone()[0] or ""
+        key = hashlib.md5(f"{self._normalize_query(query)}|{params!r}|{index_set}".encode()).hexdigest()
+        
+        plan = self._plan_cache.get(key)
+        if plan is None:
+            explain_query = f"EXPLAIN QUERY PLAN {query}"
+            self._stmt_stats[self._normalize_query(explain_query)] += 1
+            self.cursor.execute(explain_query, params)
+            # SQLite EXPLAIN QUERY PLAN returns: (id, parent, notused, detail)
+            plan = [
+                {"id": step_id, "parent": parent, "detail": detail}
+                for step_id, parent, _, detail in self.cursor
+            ]
+            self._plan_cache[key] = plan
+        return plan
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Collapse whitespace so formatting differences map to the same statement"""
+        return re.sub(r"\s+", " ", query.strip())
+    
+    @staticmethod
+    def plan_optimized(before: List[Dict], after: List[Dict]) -> bool:
+        """
+        Check whether a table that was scanned in one plan is searched in another
+        
+        Args:
+            before: Plan steps returned by explain_query
+            after: Plan steps for the same query after a change
+        
+        Returns:
+            True if any SCAN of a table became a SEARCH
+        """
+        def tables(plan, operation):
+            return {
+                step['detail'].split()[1]
+                for step in plan
+                if step['detail'].startswith(f"{operation} ")
+            }
+        
+        return bool(tables(before, "SCAN") & tables(after, "SEARCH"))
     
     def list_indexes(self):
         """List all indexes in the database"""
@@ -113,12 +352,20 @@ class QueryOptimizer:
             ORDER BY tbl_name, name
         """
         
-        df = pd.read_sql_query(query, self.conn)
+        rows = self.cursor.execute(query).fetchall()
         
-        if len(df) == 0:
+        if not rows:
             print("  No user-defined indexes found.")
         else:
-            print(df.to_string(index=False))
+            # A dozen rows at most, so pad columns by hand rather than build a DataFrame
+            columns = ("index_name", "table_name", "create_statement")
+            widths = [
+                max(len(column), max(len(str(row[i])) for row in rows))
+                for i, column in enumerate(columns)
+            ]
+            print(" | ".join(column.ljust(widths[i]) for i, column in enumerate(columns)))
+            for row in rows:
+                print(" | ".join(str(value).ljust(widths[i]) for i, value in enumerate(row)))
         
         print()
     
@@ -130,33 +377,47 @@ class QueryOptimizer:
         
         indexes = [
             ("idx_customers_email", "customers(email)"),
-            ("idx_customers_city_state", "customers(city, state)"),
+            # A multi-column index is only usable from its leftmost column with
+            # no gaps, so state-only filters need state first; city gets its own
+            ("idx_customers_city", "customers(city)"),
+            ("idx_customers_state_city", "customers(state, city)"),
             ("idx_customers_tier", "customers(customer_tier)"),
             ("idx_orders_customer_id", "orders(customer_id)"),
             ("idx_orders_order_date", "orders(order_date)"),
             ("idx_orders_status", "orders(order_status)"),
+            ("idx_orders_date_status", "orders(order_date, order_status)"),
             ("idx_order_items_order_id", "order_items(order_id)"),
             ("idx_order_items_product_id", "order_items(product_id)"),
             ("idx_products_category_id", "products(category_id)"),
         ]
         
-        created = 0
+        created = []
         skipped = 0
         
-        for idx_name, idx_definition in indexes:
-            try:
-                query = f"CREATE INDEX IF NOT EXISTS {idx_name} ON {idx_definition}"
-                self.cursor.execute(query)
-                print(f"  ✓ Created: {idx_name} on {idx_definition}")
-                created += 1
-            except sqlite3.Error as e:
-                print(f"  ⚠ Skipped: {idx_name} ({e})")
-                skipped += 1
-        
-        self.conn.commit()
-        
-        print(f"\n  Total created: {created}")
+        # sqlite3 doesn't open a transaction for DDL by itself, so BEGIN explicitly
+        # to commit every index at once; the with block commits or rolls back
+        with self.conn:
+            self.cursor.execute("BEGIN")
+            for idx_name, idx_definition in indexes:
+                try:
+                    query = f"CREATE INDEX IF NOT EXISTS {idx_name} ON {idx_definition}"
+                    self.cursor.execute(query)
+                    print(f"  ✓ Created: {idx_name} on {idx_definition}")
+                    created.append(idx_name)
+                except sqlite3.Error as e:
+                    print(f"  ⚠ Skipped: {idx_name} ({e})")
+                    skipped += 1
+            
+            # Gather statistics for just the new indexes, sampling at most 1000
+            # rows each, then have the planner reload them
+            self.cursor.execute("PRAGMA analysis_limit=1000")
+            for idx_name in created:
+                self.cursor.execute(f"ANALYZE {idx_name}")
+            self.cursor.execute("ANALYZE sqlite_master")
+        
+        print(f"\n  Total created: {len(created)}")
         print(f"  Total skipped: {skipped}")
+        print(f"  ✓ Statistics updated for {len(created)} indexes")
         print("="*80)
     
     def drop_all_indexes(self):
@@ -165,12 +426,13 @@ class QueryOptimizer:
         print("DROPPING ALL USER INDEXES")
         print(f"{'='*80}\n")
         
-        # Get all user indexes
+        # Get all user indexes; UNIQUE indexes enforce constraints, so keep them
         self.cursor.execute("""
             SELECT name 
             FROM sqlite_master 
             WHERE type = 'index' 
                 AND name NOT LIKE 'sqlite_%'
+                AND sql NOT LIKE 'CREATE UNIQUE INDEX%'
         """)
         
         indexes = self.cursor.fetchall()
@@ -179,14 +441,15 @@ class QueryOptimizer:
             print("  No user indexes to drop.")
             return
         
-        for (idx_name,) in indexes:
-            try:
-                self.cursor.execute(f"DROP INDEX IF EXISTS {idx_name}")
-                print(f"  ✓ Dropped: {idx_name}")
-            except sqlite3.Error as e:
-                print(f"  ⚠ Error dropping {idx_name}: {e}")
+        with self.conn:
+            self.cursor.execute("BEGIN")
+            for (idx_name,) in indexes:
+                try:
+                    self.cursor.execute(f"DROP INDEX IF EXISTS {idx_name}")
+                    print(f"  ✓ Dropped: {idx_name}")
+                except sqlite3.Error as e:
+                    print(f"  ⚠ Error dropping {idx_name}: {e}")
         
-        self.conn.commit()
         print("="*80)
     
     def run_performance_tests(self):
@@ -195,57 +458,11 @@ class QueryOptimizer:
         print("SQL PERFORMANCE OPTIMIZATION SUITE")
         print("🚀"*40)
         
-        # Test queries
-        test_queries = {
-            "Customer Email Lookup": """
-                SELECT * FROM customers 
-                WHERE email = 'emily.johnson100@email.com'
-            """,
-            
-            "Customer Orders Join": """
-                SELECT 
-                    c.customer_id,
-                    c.first_name,
-                    c.last_name,
-                    COUNT(o.order_id) AS order_count,
-                    ROUND(SUM(o.total_amount), 2) AS total_spent
-                FROM customers c
-                JOIN orders o ON c.customer_id = o.customer_id
-                WHERE o.order_status = 'Completed'
-                GROUP BY c.customer_id, c.first_name, c.last_name
-                HAVING COUNT(o.order_id) >= 3
-                ORDER BY total_spent DESC
-                LIMIT 20
-            """,
-            
-            "Date Range Query": """
-                SELECT 
-                    strftime('%Y-%m', order_date) AS month,
-                    COUNT(*) AS orders,
-                    ROUND(SUM(total_amount), 2) AS revenue
-                FROM orders
-                WHERE order_date >= date('now', '-6 months')
-                    AND order_status = 'Completed'
-                GROUP BY strftime('%Y-%m', order_date)
-                ORDER BY month
-            """,
-            
-            "Multi-Table Join": """
-                SELECT 
-                    cat.category_name,
-                    p.product_name,
-                    COUNT(DISTINCT o.customer_id) AS customers,
-                    SUM(oi.quantity) AS units_sold,
-                    ROUND(SUM(oi.line_total), 2) AS revenue
-                FROM categories cat
-                JOIN products p ON cat.category_id = p.category_id
-                JOIN order_items oi ON p.product_id = oi.product_id
-                JOIN orders o ON oi.order_id = o.order_id
-                WHERE o.order_status = 'Completed'
-                GROUP BY cat.category_name, p.product_name
-                ORDER BY revenue DESC
-                LIMIT 10
-            """
+        # Bound parameters for TEST_QUERIES; the date range lower bound is
+        # computed here so SQLite sees a plain indexable range predicate
+        six_months_ago = (datetime.now() - timedelta(days=183)).strftime('%Y-%m-%d')
+        query_params = {
+            "Date Range Query": (six_months_ago,),
         }
         
         print("\n" + "="*80)
@@ -255,12 +472,26 @@ class QueryOptimizer:
         # Drop indexes
         self.drop_all_indexes()
         
+        # Run the cheapest queries first; both phases use this same order so
+        # each query sees a comparable cache state in Phase 1 and Phase 3
+        test_queries = sorted(
+            TEST_QUERIES,
+            key=lambda item: self.estimate_rows_touched(item[1], query_params.get(item[0], ()))
+        )
+        print("\nQuery order (by estimated rows touched):")
+        for name, _ in test_queries:
+            print(f"  {name}")
+        
+        self._drop_caches()
+        
         # Run benchmarks without indexes
         results_no_index = []
-        for name, query in test_queries.items():
-            result = self.benchmark_query(query, name, iterations=3)
+        phase1_plans = {}
+        for name, query in test_queries:
+            params = query_params.get(name, ())
+            result = self.benchmark_query(query, name, iterations=3, params=params)
             results_no_index.append(result)
-            self.explain_query(query, name)
+            phase1_plans[name] = self.explain_query(query, name, params)
         
         input("\nPress Enter to create indexes and re-test...")
         
@@ -268,47 +499,55 @@ class QueryOptimizer:
         print("PHASE 2: CREATING INDEXES")
         print("="*80)
         
-        # Create indexes
+        # Create indexes (this also gathers their optimizer statistics)
         self.create_performance_indexes()
         
-        # Run ANALYZE to update statistics
-        print("\nRunning ANALYZE to update query optimizer statistics...")
-        self.cursor.execute("ANALYZE")
-        self.conn.commit()
-        print("✓ Statistics updated")
-        
         print("\n" + "="*80)
         print("PHASE 3: PERFORMANCE WITH INDEXES")
         print("="*80)
         
+        # Start cold again so Phase 3 doesn't inherit the cache Phase 1 warmed
+        self._drop_caches()
+        
         # Run benchmarks with indexes
         results_with_index = []
-        for name, query in test_queries.items():
-            result = self.benchmark_query(query, name, iterations=3)
+        phase3_plans = {}
+        for name, query in test_queries:
+            params = query_params.get(name, ())
+            result = self.benchmark_query(query, name, iterations=3, params=params)
             results_with_index.append(result)
-            self.explain_query(query, name)
+            phase3_plans[name] = self.explain_query(query, name, params)
         
         # Compare results
         print("\n" + "="*80)
         print("PERFORMANCE COMPARISON")
         print("="*80 + "\n")
         
-        comparison_data = []
-        for no_idx, with_idx in zip(results_no_index, results_with_index):
-            speedup = no_idx['avg_time'] / with_idx['avg_time']
-            improvement_pct = ((no_idx['avg_time'] - with_idx['avg_time']) / no_idx['avg_time']) * 100
-            
-            comparison_data.append({
-                'Query': no_idx['query_name'],
-                'Without Index': f"{no_idx['avg_time']:.4f}s",
-                'With Index': f"{with_idx['avg_time']:.4f}s",
-                'Speedup': f"{speedup:.2f}x",
-                'Improvement': f"{improvement_pct:.1f}%"
-            })
-        
-        df = pd.DataFrame(comparison_data)
+        names = [r['query_name'] for r in results_no_index]
+        no_idx = np.array([r['median_time'] for r in results_no_index])
+        with_idx = np.array([r['median_time'] for r in results_with_index])
+        
+        df = pd.DataFrame({
+            'Query': names,
+            'Without Index (s)': no_idx.round(6),
+            'With Index (s)': with_idx.round(6),
+            'Speedup': (no_idx / with_idx).round(2),
+            'Improvement %': ((no_idx - with_idx) / no_idx * 100).round(1),
+            'Cold Without (s)': np.round([r['cold_time'] for r in results_no_index], 6),
+            'Cold With (s)': np.round([r['cold_time'] for r in results_with_index], 6),
+            'Plan': [
+                "OPTIMIZED" if self.plan_optimized(phase1_plans[name], phase3_plans[name]) else "unchanged"
+                for name in names
+            ]
+        })
         print(df.to_string(index=False))
         
+        # Counts cover Phase 3 only: _drop_caches reconnected before it
+        explains = sum(count for stmt, count in self._stmt_stats.items() if stmt.startswith("EXPLAIN "))
+        queries = sum(self._stmt_stats.values()) - explains
+        print(f"\nStatements on the Phase 3 connection: {queries} query runs, {explains} EXPLAINs, "
+              f"{len(self._stmt_stats)} distinct")
+        
         print("\n" + "="*80)
         print("✅ PERFORMANCE TESTING COMPLETE!")
         print("="*80)
@@ -318,10 +557,12 @@ class QueryOptimizer:
         print("  ✓ Date indexes help range queries")
         print("  ✓ Always run EXPLAIN QUERY PLAN to understand execution")
         print("  ✓ Use ANALYZE to update optimizer statistics")
+        print("  ✓ Benchmark queries in the same smallest-first order in every phase")
         print("="*80)
     
     def close(self):
-        """Close database connection"""
+        """Refresh planner statistics and close database connection"""
+        self.cursor.execute("PRAGMA optimize")
         self.conn.close()
         print("\n✓ Database connection closed")
 
@@ -8,7 +8,23 @@ Date: 2025-10-30
 
 import sqlite3
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+
+EPOCH = date(1970, 1, 1)
+
+# The validity range is stored as integer days since EPOCH; the ISO dates are
+# VIRTUAL columns generated from them for display
+DATE_COLUMNS = {
+    'valid_from': "date(valid_from_day + 2440587.5)",
+    'valid_to': "date(valid_to_day + 2440587.5)",
+}
+
+def epoch_day(iso_date):
+    """Convert a YYYY-MM-DD date to days since 1970-01-01"""
+    return (datetime.strptime(iso_date, '%Y-%m-%d').date() - EPOCH).days
+
+# valid_to_day of current records (9999-12-31)
+OPEN_END_DAY = epoch_day('9999-12-31')
 
 class SCDManager:
     """
@@ -21,44 +37,86 @@ class SCDManager:
         self.cursor = self.conn.cursor()
         print(f"✓ Connected to {db_path}\n")
     
+    def migrate_schema(self):
+        """
+        Bring an existing warehouse's dim_customer up to the current schema
+        Converts stored TEXT valid_from/valid_to into stored day numbers and
+        (re)builds the SCD indexes; safe to run repeatedly. Warehouses created
+        from data_modeling.sql already match, so this only changes older ones.
+        """
+        # table_xinfo's hidden flag is 0 for ordinary stored columns
+        self.cursor.execute("PRAGMA table_xinfo(dim_customer)")
+        columns = {row[1]: row[6] for row in self.cursor.fetchall()}
+        stored = {name for name, hidden in columns.items() if hidden == 0}
+        
+        if 'valid_from_day' not in stored:
+            # Older layouts store the TEXT dates (possibly with VIRTUAL day columns
+            # on top). Swap them with ALTER TABLE rather than rebuilding the table,
+            # so fact_sales' foreign key keeps pointing at the same table.
+            # (Migrated tables keep valid_from_day nullable: ADD COLUMN can't add
+            # NOT NULL without a default.)
+            with self.conn:
+                self.cursor.execute("BEGIN")
+                self.cursor.execute("DROP INDEX IF EXISTS idx_dim_customer_scd")
+                for column in ('valid_from_day', 'valid_to_day'):
+                    if column in columns:
+                        self.cursor.execute(f"ALTER TABLE dim_customer DROP COLUMN {column}")
+                self.cursor.execute("ALTER TABLE dim_customer ADD COLUMN valid_from_day INTEGER")
+                self.cursor.execute(
+                    f"ALTER TABLE dim_customer ADD COLUMN valid_to_day INTEGER NOT NULL DEFAULT {OPEN_END_DAY}"
+                )
+                self.cursor.execute("""
+                    UPDATE dim_customer
+                    SET valid_from_day = CAST(julianday(valid_from) - 2440587.5 AS INTEGER),
+                        valid_to_day = CAST(julianday(valid_to) - 2440587.5 AS INTEGER)
+                """)
+                for column, expression in DATE_COLUMNS.items():
+                    self.cursor.execute(f"ALTER TABLE dim_customer DROP COLUMN {column}")
+                    self.cursor.execute(f"""
+                        ALTER TABLE dim_customer
+                        ADD COLUMN {column} DATE GENERATED ALWAYS AS ({expression}) VIRTUAL
+                    """)
+            print("✓ Converted dim_customer validity dates to day numbers")
+        
+        # Covering index for current-record and point-in-time lookups, plus a
+        # smaller partial index for the hot "fetch current row" path. The old
+        # (customer_id, is_current) index is a prefix of the covering one.
+        self.cursor.execute("DROP INDEX IF EXISTS idx_dim_customer_natural_key")
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_dim_customer_scd
+            ON dim_customer(customer_id, is_current, valid_from_day, valid_to_day)
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_dim_customer_current
+            ON dim_customer(customer_id) WHERE is_current = 1
+        """)
+        self.conn.commit()
+        print("✓ dim_customer schema is up to date\n")
+    
     def show_current_customers(self, customer_id=None):
         """Display current customer records"""
         print("="*80)
         print("CURRENT CUSTOMER RECORDS (SCD Type 2)")
         print("="*80 + "\n")
         
-        if customer_id:
-            query = f"""
-                SELECT 
-                    customer_key,
-                    customer_id,
-                    first_name,
-                    last_name,
-                    customer_tier,
-                    valid_from,
-                    valid_to,
-                    is_current
-                FROM dim_customer
-                WHERE customer_id = {customer_id}
-                ORDER BY valid_from
-            """
-        else:
-            query = """
-                SELECT 
-                    customer_key,
-                    customer_id,
-                    first_name,
-                    last_name,
-                    customer_tier,
-                    valid_from,
-                    valid_to,
-                    is_current
-                FROM dim_customer
-                WHERE customer_id IN (1, 2, 3, 4, 5)
-                ORDER BY customer_id, valid_from
-            """
-        
-        df = pd.read_sql_query(query, self.conn)
+        customer_ids = (customer_id,) if customer_id else (1, 2, 3, 4, 5)
+        placeholders = ", ".join("?" * len(customer_ids))
+        query = f"""
+            SELECT 
+                customer_key,
+                customer_id,
+                first_name,
+                last_name,
+                customer_tier,
+                valid_from,
+                valid_to,
+                is_current
+            FROM dim_customer
+            WHERE customer_id IN ({placeholders})
+            ORDER BY customer_id, valid_from_day
+        """
+        
+        df = pd.read_sql_query(query, self.conn, params=customer_ids)
         print(df.to_string(index=False))
         print()
     
@@ -118,23 +176,24 @@ class SCDManager:
         
         self.cursor.execute("""
             UPDATE dim_customer
-            SET valid_to = ?,
+            SET valid_to_day = ?,
                 is_current = 0,
-                updated_at = ?
+                updated_at = CURRENT_TIMESTAMP
             WHERE customer_key = ?
-        """, (yesterday, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), current_record[0]))
+        """, (epoch_day(yesterday), current_record[0]))
         
         print(f"✓ Closed old record (customer_key={current_record[0]})")
         print(f"  - Set valid_to = {yesterday}")
         print(f"  - Set is_current = 0")
         
         # Step 3: Insert new record with updated tier
+        # (created_at/updated_at come from the schema's CURRENT_TIMESTAMP defaults)
         self.cursor.execute("""
             INSERT INTO dim_customer (
                 customer_id, first_name, last_name, email, phone,
                 city, state, customer_tier, registration_date,
-                valid_from, valid_to, is_current, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '9999-12-31', 1, ?, ?)
+                valid_from_day, valid_to_day, is_current
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
         """, (
             current_record[1],  # customer_id
             current_record[2],  # first_name
@@ -145,9 +204,8 @@ class SCDManager:
             current_record[7],  # state
             new_tier,           # NEW customer_tier
             current_record[9],  # registration_date
-            effective_date,     # valid_from
-            datetime.now().strftime('%Y-%m-%d %H:%M:%S'),  # created_at
-            datetime.now().strftime('%Y-%m-%d %H:%M:%S')   # updated_at
+            epoch_day(effective_date),  # valid_from_day
+            OPEN_END_DAY                # valid_to_day
         ))
         
         new_key = self.cursor.lastrowid
@@ -160,6 +218,90 @@ class SCDManager:
         self.conn.commit()
         print("\n✅ SCD Type 2 update completed successfully!")
     
+    def update_customer_tiers_bulk(self, updates):
+        """
+        Apply many SCD Type 2 tier changes in a single transaction
+        
+        Current records are fetched with one IN query, then all old records are
+        closed and all new records inserted with one executemany each.
+        
+        Args:
+            updates: Iterable of (customer_id, new_tier, effective_date) tuples:
+                     customer_id is the natural key (int), new_tier one of
+                     Bronze/Silver/Gold/Platinum, effective_date a YYYY-MM-DD
+                     string or None for today
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        
+        # Last update wins if a customer appears more than once
+        changes = {
+            customer_id: (new_tier, effective_date or today)
+            for customer_id, new_tier, effective_date in updates
+        }
+        
+        print(f"\n{'='*80}")
+        print(f"BULK UPDATING {len(changes)} CUSTOMER TIERS")
+        print(f"{'='*80}\n")
+        
+        if not changes:
+            print("⚠️  No updates given")
+            return
+        
+        placeholders = ", ".join("?" * len(changes))
+        self.cursor.execute(f"""
+            SELECT 
+                customer_key,
+                customer_id,
+                first_name,
+                last_name,
+                email,
+                phone,
+                city,
+                state,
+                customer_tier,
+                registration_date
+            FROM dim_customer
+            WHERE customer_id IN ({placeholders}) AND is_current = 1
+        """, list(changes))
+        current_records = {row[1]: row for row in self.cursor.fetchall()}
+        
+        close_rows = []
+        insert_rows = []
+        for customer_id, (new_tier, effective_date) in changes.items():
+            record = current_records.get(customer_id)
+            if record is None or record[8] == new_tier:
+                continue
+            valid_from_day = epoch_day(effective_date)
+            close_rows.append((valid_from_day - 1, record[0]))
+            insert_rows.append(record[1:8] + (new_tier, record[9], valid_from_day, OPEN_END_DAY))
+        
+        missing = len(changes) - len(current_records)
+        unchanged = len(current_records) - len(close_rows)
+        
+        with self.conn:
+            self.cursor.executemany("""
+                UPDATE dim_customer
+                SET valid_to_day = ?,
+                    is_current = 0,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE customer_key = ?
+            """, close_rows)
+            self.cursor.executemany("""
+                INSERT INTO dim_customer (
+                    customer_id, first_name, last_name, email, phone,
+                    city, state, customer_tier, registration_date,
+                    valid_from_day, valid_to_day, is_current
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+            """, insert_rows)
+        
+        print(f"✓ Closed {len(close_rows)} old records")
+        print(f"✓ Created {len(insert_rows)} new records")
+        if unchanged:
+            print(f"⚠️  {unchanged} customers already had the requested tier")
+        if missing:
+            print(f"❌ {missing} customers not found or have no current record")
+        print("\n✅ SCD Type 2 bulk update completed successfully!")
+    
     def demonstrate_scd_type2(self):
         """
         Full demonstration of SCD Type 2 workflow
@@ -203,9 +345,9 @@ class SCDManager:
                 valid_to
             FROM dim_customer
             WHERE customer_id = 1
-                AND '2024-06-01' BETWEEN valid_from AND valid_to
+                AND ? BETWEEN valid_from_day AND valid_to_day
         """
-        df = pd.read_sql_query(query, self.conn)
+        df = pd.read_sql_query(query, self.conn, params=(epoch_day('2024-06-01'),))
         print(df.to_string(index=False))
         
         print("\n\nExample: What is customer 1's current tier?")
@@ -279,6 +421,7 @@ class SCDManager:
 def main():
     """Main execution"""
     scd = SCDManager()
+    scd.migrate_schema()
     
     print("="*80)
     print("SLOWLY CHANGING DIMENSIONS (SCD) DEMONSTRATION")
@@ -6,21 +6,58 @@ Date: 2025-10-20
 """
 
 import sqlite3
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-import random
+from collections import OrderedDict
+from itertools import accumulate
+from unittest import mock
 from faker import Faker
+from faker.providers import BaseProvider
 
 fake = Faker()
-random.seed(42)
 Faker.seed(42)
 
+_faker_random_element = BaseProvider.random_element
+
+def cached_random_element(self, elements=('a', 'b', 'c')):
+    """
+    Drop-in for Faker's random_element that caches weighted lookups
+    
+    Faker rebuilds the cumulative weights of a weighted OrderedDict (e.g. the
+    thousands of first names) on every call. This caches the keys and
+    cumulative weights on the dict and makes the same single random.choices
+    draw, so the seeded output is unchanged.
+    """
+    if isinstance(elements, OrderedDict) and self.__use_weighting__:
+        cached = getattr(elements, '_cached_cum_weights', None)
+        if cached is None:
+            cached = (tuple(elements.keys()), list(accumulate(elements.values())))
+            elements._cached_cum_weights = cached
+        choices, cum_weights = cached
+        return self.generator.random.choices(choices, cum_weights=cum_weights, k=1)[0]
+    return _faker_random_element(self, elements)
+
 def create_database():
     """Create SQLite database with multiple related tables"""
 
     print("Creating sales_analytics.db...")
-    conn = sqlite3.connect('sales_analytics.db')
+    # One seeded generator drives every random column
+    rng = np.random.default_rng(42)
+    
+    # Autocommit mode, so the whole rebuild is bracketed by one explicit BEGIN / COMMIT
+    conn = sqlite3.connect('sales_analytics.db', isolation_level=None)
     cursor = conn.cursor()
+    
+    # Bulk-load settings; these must be set before the transaction starts
+    # (journal_mode can't change inside one, and executescript would commit it)
+    cursor.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-65536;
+        PRAGMA mmap_size=10737418240;
+    """)
+    cursor.execute("BEGIN")
 
     # Drop tables if they exist
     cursor.execute("DROP TABLE IF EXISTS order_items")
@@ -68,7 +105,6 @@ def create_database():
         )
     """)
     
-    products = []
     product_names = {
         1: ['Laptop', 'Smartphone', 'Headphones', 'Tablet', 'Smartwatch', 'Camera'],
         2: ['T-Shirt', 'Jeans', 'Sneakers', 'Jacket', 'Dress', 'Hoodie'],
@@ -78,14 +114,21 @@ def create_database():
         6: ['Action Figure', 'Board Game', 'Puzzle', 'Doll', 'LEGO Set', 'Video Game']
     }
     
-    product_id = 1
-    for cat_id, names in product_names.items():
-        for name in names:
-            price = round(random.uniform(9.99, 299.99), 2)
-            stock = random.randint(0, 500)
-            is_active = 1 if stock > 0 else random.choice([0, 1])
-            products.append((product_id, name, cat_id, price, stock, is_active))
-            product_id += 1
+    product_rows = [(cat_id, name) for cat_id, names in product_names.items() for name in names]
+    num_products = len(product_rows)
+    
+    prices = np.round(rng.uniform(9.99, 299.99, num_products), 2)
+    stocks = rng.integers(0, 501, num_products)
+    # Out-of-stock products are randomly active or inactive
+    is_active = np.where(stocks > 0, 1, rng.integers(0, 2, num_products))
+    
+    products = [
+        (product_id, name, cat_id, price, stock, active)
+        for product_id, (cat_id, name), price, stock, active in zip(
+            range(1, num_products + 1), product_rows,
+            prices.tolist(), stocks.tolist(), is_active.tolist()
+        )
+    ]
     
     cursor.executemany(
         "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?)",
@@ -99,7 +142,7 @@ def create_database():
             customer_id INTEGER PRIMARY KEY,
             first_name TEXT NOT NULL,
             last_name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
+            email TEXT NOT NULL,
             phone TEXT,
             city TEXT,
             state TEXT,
@@ -108,25 +151,51 @@ def create_database():
         )
     """)
     
-    customers = []
+    num_customers = 500
     customer_tiers = ['Bronze', 'Silver', 'Gold', 'Platinum']
     
-    for i in range(1, 501):  # 500 customers
-        first_name = fake.first_name()
-        last_name = fake.last_name()
-        email = f"{first_name.lower()}.{last_name.lower()}{i}@email.com"
-        phone = fake.phone_number()[:15]
-        city = fake.city()
-        state = fake.state_abbr()
-        reg_date = fake.date_between(start_date='-3y', end_date='today')
-        tier = random.choices(customer_tiers, weights=[50, 30, 15, 5])[0]
-        
-        customers.append((i, first_name, last_name, email, phone, city, state, reg_date, tier))
+    # Names and places are drawn from small Faker-built pools; phones still come
+    # from Faker per customer, everything else is built a column at a time
+    with mock.patch.object(BaseProvider, 'random_element', cached_random_element):
+        first_pool = [fake.first_name() for _ in range(200)]
+        last_pool = [fake.last_name() for _ in range(200)]
+        city_pool = [fake.city() for _ in range(200)]
+        state_pool = [fake.state_abbr() for _ in range(60)]
+        phones = [fake.phone_number()[:15] for _ in range(num_customers)]
+    
+    first_names = pd.Series(rng.choice(first_pool, num_customers), dtype=object)
+    last_names = pd.Series(rng.choice(last_pool, num_customers), dtype=object)
+    cities = rng.choice(city_pool, num_customers).astype(object)
+    states = rng.choice(state_pool, num_customers).astype(object)
+    
+    customer_ids = np.arange(1, num_customers + 1)
+    emails = (
+        first_names.str.lower() + '.' + last_names.str.lower()
+        + pd.Series(customer_ids.astype(str)) + '@email.com'
+    )
+    # Registered some time in the last 3 years
+    reg_dates = np.datetime64('today', 'D') - rng.integers(0, 1096, num_customers)
+    tiers = rng.choice(customer_tiers, num_customers, p=[0.50, 0.30, 0.15, 0.05])
+    
+    customers = pd.DataFrame({
+        'customer_id': customer_ids,
+        'first_name': first_names,
+        'last_name': last_names,
+        'email': emails,
+        'phone': phones,
+        'city': cities,
+        'state': states,
+        'registration_date': reg_dates.astype(str),
+        'customer_tier': tiers.astype(object)
+    })
     
     cursor.executemany(
         "INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
-        customers
+        customers.itertuples(index=False, name=None)
     )
+    # Enforce unique emails with one index build after the load rather than a
+    # uniqueness check on every insert
+    cursor.execute("CREATE UNIQUE INDEX idx_customers_email ON customers(email)")
     print(f"✓ Created customers table (500 customers)")
     
     # 4. ORDERS TABLE
@@ -142,29 +211,28 @@ def create_database():
         )
     """)
     
-    orders = []
+    num_orders = 2000
     order_statuses = ['Completed', 'Pending', 'Shipped', 'Cancelled']
     
-    for order_id in range(1, 2001):  # 2000 orders
-        customer_id = random.randint(1, 500)
-        order_date = fake.date_between(start_date='-1y', end_date='today')
-        
-        # Ship date is 1-7 days after order (if not cancelled)
-        status = random.choices(order_statuses, weights=[70, 15, 10, 5])[0]
-        
-        if status in ['Shipped', 'Completed']:
-            ship_date = order_date + timedelta(days=random.randint(1, 7))
-        else:
-            ship_date = None
-        
-        # Total amount will be calculated from order_items
-        orders.append((order_id, customer_id, order_date, ship_date, status, 0))
+    order_ids = np.arange(1, num_orders + 1)
+    order_customer_ids = rng.integers(1, num_customers + 1, num_orders)
+    # Placed some time in the last year
+    order_dates = np.datetime64('today', 'D') - rng.integers(0, 366, num_orders)
+    statuses = rng.choice(order_statuses, num_orders, p=[0.70, 0.15, 0.10, 0.05])
     
-    cursor.executemany(
-        "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)",
-        orders
-    )
-    print(f"✓ Created orders table (2000 orders)")
+    # Ship date is 1-7 days after order (only for shipped/completed orders)
+    ship_gaps = rng.integers(1, 8, num_orders)
+    shipped = np.isin(statuses, ['Shipped', 'Completed'])
+    ship_dates = np.where(shipped, (order_dates + ship_gaps).astype(str), None)
+    
+    # Total amount is filled in from order_items before the insert
+    orders = list(zip(
+        order_ids.tolist(),
+        order_customer_ids.tolist(),
+        order_dates.astype(str).tolist(),
+        ship_dates.tolist(),
+        statuses.tolist()
+    ))
     
     # 5. ORDER ITEMS TABLE (junction table)
     cursor.execute("""
@@ -180,41 +248,49 @@ def create_database():
         )
     """)
     
-    order_items = []
-    order_item_id = 1
-    
-    # Get product prices for reference
-    cursor.execute("SELECT product_id, unit_price FROM products")
-    product_prices = dict(cursor.fetchall())
-    
-    for order_id in range(1, 2001):
-        # Each order has 1-5 items
-        num_items = random.randint(1, 5)
-        order_total = 0
-        
-        for _ in range(num_items):
-            product_id = random.randint(1, len(products))
-            quantity = random.randint(1, 5)
-            unit_price = product_prices[product_id]
-            line_total = round(quantity * unit_price, 2)
-            order_total += line_total
-            
-            order_items.append((order_item_id, order_id, product_id, quantity, unit_price, line_total))
-            order_item_id += 1
-        
-        # Update order total
-        cursor.execute(
-            "UPDATE orders SET total_amount = ? WHERE order_id = ?",
-            (round(order_total, 2), order_id)
-        )
+    # Product prices indexed by product_id - 1
+    product_prices = np.array([product[3] for product in products])
+    
+    # Each order has 1-5 items; draw every line item at once
+    num_items = rng.integers(1, 6, num_orders)
+    num_lines = int(num_items.sum())
+    
+    item_order_ids = np.repeat(order_ids, num_items)
+    item_product_ids = rng.integers(1, len(products) + 1, num_lines)
+    quantities = rng.integers(1, 6, num_lines)
+    unit_prices = product_prices[item_product_ids - 1]
+    line_totals = np.round(quantities * unit_prices, 2)
+    
+    # zip is lazy, so executemany streams the rows without building a list of tuples
+    order_items = zip(
+        range(1, num_lines + 1),
+        item_order_ids.tolist(),
+        item_product_ids.tolist(),
+        quantities.tolist(),
+        unit_prices.tolist(),
+        line_totals.tolist()
+    )
+    
+    # Sum line totals per order (bin 0 is unused since order ids start at 1)
+    order_totals = np.round(np.bincount(item_order_ids, weights=line_totals, minlength=num_orders + 1)[1:], 2)
+    
+    cursor.executemany(
+        "INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)",
+        [order + (total,) for order, total in zip(orders, order_totals.tolist())]
+    )
+    print(f"✓ Created orders table (2000 orders)")
     
     cursor.executemany(
         "INSERT INTO order_items VALUES (?, ?, ?, ?, ?, ?)",
         order_items
     )
-    print(f"✓ Created order_items table ({len(order_items)} line items)")
+    print(f"✓ Created order_items table ({num_lines} line items)")
     
-    conn.commit()
+    # Gather planner statistics once, while the freshly loaded data is in cache
+    cursor.execute("ANALYZE")
+    cursor.execute("PRAGMA optimize")
+    
+    cursor.execute("COMMIT")
     conn.close()
     
     print("\n" + "="*60)
@@ -222,12 +298,13 @@ def create_database():
     print("="*60)
     print(f"Database: sales_analytics.db")
     print(f"Tables: categories, products, customers, orders, order_items")
-    print(f"Total records: {6 + len(products) + 500 + 2000 + len(order_items):,}")
+    print(f"Total records: {6 + len(products) + 500 + 2000 + num_lines:,}")
     print("="*60)
 
 def display_sample_data():
     """Display sample data from each table"""
     conn = sqlite3.connect('sales_analytics.db')
+    cursor = conn.cursor()
     
     tables = ['categories', 'products', 'customers', 'orders', 'order_items']
     
@@ -237,7 +314,9 @@ def display_sample_data():
     
     for table in tables:
         print(f"\n--- {table.upper()} (first 3 rows) ---")
-        df = pd.read_sql_query(f"SELECT * FROM {table} LIMIT 3", conn)
+        cursor.execute(f"SELECT * FROM {table} LIMIT 3")
+        columns = [col[0] for col in cursor.description]
+        df = pd.DataFrame(cursor.fetchall(), columns=columns)
         print(df.to_string(index=False))
     
     conn.close()